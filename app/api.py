@@ -6,25 +6,73 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 from app.chatbot import get_chatbot, initialize_chatbot
+from app.rate_limit import create_rate_limiter, create_load_shedder
+from app.http_cache import SnapshotCache, cached_json_response
+from app.profiling import SamplingProfiler, SlowRequestRecorder, install_signal_toggle
+from app.state import create_state_store
+from app.experiments import create_experiment
+import hmac
 import json
+import time
+import traceback
 from datetime import datetime
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for web integration
+CORS(app, resources={r"^/(?!admin/).*": {"origins": "*"}})  # Enable CORS for web integration, never for /admin
+
+# Startup state reported by /ready
+startup_state = {
+    'ready': False,
+    'model_trained': False,
+    'started_at': datetime.now().isoformat(),
+    'timings_ms': {},
+    'warmup': {}
+}
+
+def startup():
+    """Train the model and warm it up before the worker reports ready"""
+    start = time.perf_counter()
+    trained = initialize_chatbot()
+    trained_at = time.perf_counter()
+    
+    warmup = chatbot.warm_up() if trained else {}
+    warmed_at = time.perf_counter()
+    
+    startup_state['model_trained'] = trained
+    startup_state['warmup'] = warmup
+    startup_state['timings_ms'] = {
+        'model_training': round((trained_at - start) * 1000, 2),
+        'warmup': round((warmed_at - trained_at) * 1000, 2),
+        'total': round((warmed_at - start) * 1000, 2)
+    }
+    startup_state['ready'] = trained
 
 # Initialize chatbot on startup
 chatbot = get_chatbot()
-initialize_chatbot()
-
-# Analytics storage (in production, use a proper database)
-analytics_data = {
-    'total_conversations': 0,
-    'intent_counts': {},
-    'sentiment_counts': {'positive': 0, 'negative': 0, 'neutral': 0},
-    'language_usage': {'en': 0, 'hi': 0},
-    'daily_stats': {}
-}
+startup()
+
+# Optional candidate model for shadow evaluation and A/B serving
+experiment = create_experiment(chatbot)
+
+# Admission control
+rate_limiter = create_rate_limiter()
+load_shedder = create_load_shedder()
+
+# Production debugging: sampling profiler (off until toggled) and slow-request capture
+profiler = SamplingProfiler()
+install_signal_toggle(profiler)
+slow_requests = SlowRequestRecorder(
+    threshold_ms=float(os.environ.get('SLOW_REQUEST_MS', 1000)),
+    capacity=int(os.environ.get('SLOW_REQUEST_BUFFER', 100))
+)
+
+# Analytics storage, shared by all workers on the node with STATE_BACKEND=sqlite
+state_store = create_state_store()
+
+# Serialized snapshots of read endpoints, reused until the data changes
+snapshot_cache = SnapshotCache()
 
 @app.route('/', methods=['GET'])
 def home():
@@ -36,7 +84,12 @@ def home():
             "POST /chat": "Main chat endpoint",
             "GET /analytics": "Usage analytics",
             "GET /health": "Health check",
+            "GET /live": "Liveness probe",
+            "GET /ready": "Readiness probe",
             "GET /session/<user_id>": "Get session history",
+            "GET/POST /admin/profiler": "Sampling profiler report and control",
+            "GET /admin/slow-requests": "Recent slow or failed requests",
+            "GET /admin/experiment": "Candidate model comparison",
             "DELETE /session/<user_id>": "Clear session"
         },
         "status": "running"
@@ -45,11 +98,33 @@ def home():
 @app.route('/chat', methods=['POST'])
 def chat():
     """Main chat endpoint with enhanced features"""
+    # Bad input is the client's fault: answer 4xx before it can be recorded as a server failure
+    if not request.is_json:
+        return jsonify({"error": "Content-Type must be application/json"}), 415
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    for field in ("message", "user_id", "language"):
+        if field in data and not isinstance(data[field], str):
+            return jsonify({"error": f"'{field}' must be a string"}), 400
+    
+    with slow_requests.track('/chat') as trace:
+        return handle_chat(data, trace)
+
+def handle_chat(data, trace):
+    """Handle one validated chat request, recording stage timings in trace"""
     try:
-        data = request.json
         user_input = data.get("message", "")
         user_id = data.get("user_id", "anonymous")
         language = data.get("language", "en")
+        trace['details'] = {'input_chars': len(user_input), 'language': language}
+        
+        # Only known languages, so clients cannot grow response tables or analytics keys
+        if language not in chatbot.supported_languages():
+            return jsonify({
+                "error": f"Unsupported language: {language}",
+                "supported_languages": chatbot.supported_languages()
+            }), 400
         
         if not user_input.strip():
             return jsonify({
@@ -59,73 +134,161 @@ def chat():
                 "sentiment": "neutral"
             })
         
-        # Get chatbot response
-        result = chatbot.get_response(user_input, user_id, language)
+        # Rate limit per user, or per client IP for anonymous callers
+        client_key = f"user:{data['user_id']}" if data.get("user_id") else f"ip:{request.remote_addr}"
+        allowed, retry_after = rate_limiter.allow(client_key)
+        if not allowed:
+            response = jsonify({
+                "response": "You're sending messages too quickly. Please wait a moment and try again.",
+                "intent": "RateLimited",
+                "confidence": 0.0,
+                "sentiment": "neutral"
+            })
+            response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+            return response, 429
+        
+        # Serve a cached English response instead of queueing when overloaded
+        if load_shedder.should_shed():
+            result = chatbot.get_degraded_response(user_input)
+            result['degraded'] = True
+            update_analytics(result, language)
+            return jsonify(result)
+        
+        # Get chatbot response from the model this user is assigned to
+        variant, model = experiment.route(user_id) if experiment else ('primary', chatbot)
+        with load_shedder.track():
+            result = model.get_response(user_input, user_id, language, trace=trace)
+        
+        if experiment:
+            trace['details']['variant'] = variant
+            if experiment.candidate_split > 0:
+                result['variant'] = variant
+            # Scored by both models on a background thread, off the response path
+            if variant == 'primary':
+                experiment.submit(trace.get('prepared_text'), language, result)
         
         # Update analytics
         update_analytics(result, language)
         
         return jsonify(result)
         
+    except HTTPException:
+        raise
     except Exception as e:
+        # Details go to the slow-request buffer instead of the response body
+        trace['error'] = traceback.format_exc()
         return jsonify({
             "reply": "I'm sorry, I encountered an error. Please try again.",
             "intent": "Error",
             "confidence": 0.0,
             "sentiment": "neutral",
-            "error": str(e)
-        })
+            "error": type(e).__name__
+        }), 500
 
 @app.route('/analytics', methods=['GET'])
 def get_analytics():
     """Get chatbot usage analytics"""
-    return jsonify(analytics_data)
+    return cached_json_response(
+        snapshot_cache, 'analytics', state_store.analytics_version(), state_store.analytics
+    )
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
-        "status": "healthy",
+        "status": "healthy" if startup_state['ready'] else "unavailable",
         "model_trained": chatbot.is_trained,
+        "load": load_shedder.stats(),
+        "timestamp": datetime.now().isoformat()
+    }), 200 if startup_state['ready'] else 503
+
+@app.route('/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe: the process is up and serving HTTP"""
+    return jsonify({
+        "status": "alive",
         "timestamp": datetime.now().isoformat()
     })
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: the model is trained and warmed up"""
+    return jsonify({
+        "status": "ready" if startup_state['ready'] else "not_ready",
+        "model_trained": startup_state['model_trained'],
+        "started_at": startup_state['started_at'],
+        "startup_timings_ms": startup_state['timings_ms'],
+        "warmup": startup_state['warmup'],
+        "timestamp": datetime.now().isoformat()
+    }), 200 if startup_state['ready'] else 503
+
+def admin_authorized():
+    """Admin endpoints are disabled unless ADMIN_TOKEN is set, and then require X-Admin-Token"""
+    token = os.environ.get('ADMIN_TOKEN')
+    if not token:
+        return False
+    return hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode('utf-8'), token.encode('utf-8'))
+
+@app.route('/admin/profiler', methods=['GET', 'POST'])
+def profiler_control():
+    """Get the profiler report, or start/stop/reset it with {"action": ...}"""
+    if not admin_authorized():
+        return jsonify({"error": "Unauthorized"}), 403
+    
+    if request.method == 'POST':
+        action = (request.json or {}).get("action", "toggle")
+        actions = {'start': profiler.start, 'stop': profiler.stop, 'toggle': profiler.toggle, 'reset': profiler.reset}
+        if action not in actions:
+            return jsonify({"error": f"Unknown action: {action}"}), 400
+        actions[action]()
+    
+    return jsonify(profiler.report(top=request.args.get('top', 20, type=int)))
+
+@app.route('/admin/slow-requests', methods=['GET'])
+def slow_request_log():
+    """Recent slow or failed requests with stage breakdowns and stack samples"""
+    if not admin_authorized():
+        return jsonify({"error": "Unauthorized"}), 403
+    
+    limit = request.args.get('limit', type=int)
+    return jsonify({
+        "threshold_ms": slow_requests.threshold_ms,
+        "requests": slow_requests.recent(limit)
+    })
+
+@app.route('/admin/experiment', methods=['GET'])
+def experiment_report():
+    """Shadow agreement and latency comparison between the primary and candidate models"""
+    if not admin_authorized():
+        return jsonify({"error": "Unauthorized"}), 403
+    
+    if experiment is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **experiment.stats(top=request.args.get('top', 10, type=int))})
+
 @app.route('/session/<user_id>', methods=['GET'])
 def get_session_history(user_id):
     """Get conversation history for a user"""
-    if user_id in chatbot.session_memory:
-        return jsonify(chatbot.session_memory[user_id])
-    return jsonify([])
+    return cached_json_response(
+        snapshot_cache, f'session:{user_id}', chatbot.get_session_version(user_id),
+        lambda: chatbot.get_session(user_id)
+    )
 
 @app.route('/session/<user_id>', methods=['DELETE'])
 def clear_session(user_id):
     """Clear conversation history for a user"""
-    if user_id in chatbot.session_memory:
-        del chatbot.session_memory[user_id]
+    chatbot.clear_session(user_id)
+    snapshot_cache.invalidate(f'session:{user_id}')
     return jsonify({"message": "Session cleared"})
 
 def update_analytics(result, language):
     """Update analytics data"""
-    global analytics_data
-    
-    analytics_data['total_conversations'] += 1
-    
-    # Update intent counts
-    intent = result.get('intent', 'Unknown')
-    analytics_data['intent_counts'][intent] = analytics_data['intent_counts'].get(intent, 0) + 1
-    
-    # Update sentiment counts
-    sentiment = result.get('sentiment', 'neutral')
-    analytics_data['sentiment_counts'][sentiment] += 1
-    
-    # Update language usage
-    analytics_data['language_usage'][language] += 1
-    
-    # Update daily stats
-    today = datetime.now().strftime('%Y-%m-%d')
-    if today not in analytics_data['daily_stats']:
-        analytics_data['daily_stats'][today] = 0
-    analytics_data['daily_stats'][today] += 1
+    state_store.record_conversation(
+        result.get('intent', 'Unknown'),
+        result.get('sentiment', 'neutral'),
+        language,
+        datetime.now().strftime('%Y-%m-%d')
+    )
 
 if __name__ == '__main__':
     print("Starting SkillHigh Chatbot API...")
@@ -133,6 +296,8 @@ if __name__ == '__main__':
     print("- POST /chat - Main chat endpoint")
     print("- GET /analytics - Usage analytics")
     print("- GET /health - Health check")
+    print("- GET /live - Liveness probe")
+    print("- GET /ready - Readiness probe")
     print("- GET /session/<user_id> - Get session history")
     print("- DELETE /session/<user_id> - Clear session")
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
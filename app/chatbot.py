@@ -1,8 +1,13 @@
 # Advanced AI Chatbot for SkillHigh
+import os
 import pandas as pd
 import numpy as np
 import pickle
+import random
 import re
+import threading
+import time
+import traceback
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.naive_bayes import MultinomialNB
@@ -13,6 +18,15 @@ from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 from nltk.stem import WordNetLemmatizer
 import warnings
+from collections import OrderedDict
+from app.compact_model import CompactIntentModel, model_nbytes, intern_responses, verify_predictions
+from app.context import IntentTransitionPriors
+from app.responses import build_response_bundle, SUPPORTED_LANGUAGES
+from app.embeddings import EmbeddingIntentClassifier
+from app.profiling import stage
+from app.ingestion import ingest_corpus
+from app.state import create_state_store
+from app.language import LanguageIdentifier, ENGLISH_SAMPLES, HINGLISH_SAMPLES, normalize_hinglish
 warnings.filterwarnings('ignore')
 
 # Download required NLTK data
@@ -25,15 +39,39 @@ except LookupError:
     nltk.download('stopwords')
     nltk.download('wordnet')
 
+# Precompiled preprocessing patterns
+NON_WORD_PATTERN = re.compile(r'[^\w\s]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Synthetic messages used to warm up a worker before it reports ready
+WARMUP_MESSAGES = [
+    "Hi there!",
+    "What courses do you offer?",
+    "I am worried the fees are too high",
+    "Thank you!"
+]
+
 class SkillHighChatbot:
     def __init__(self):
         self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
         self.intent_classifier = MultinomialNB()
         self.lemmatizer = WordNetLemmatizer()
         self.translator = Translator()
-        self.session_memory = {}
+        self.state_store = create_state_store()
         self.conversation_history = {}
         self.is_trained = False
+        self.use_compact_model = True
+        self.compact_model = None
+        self.memory_report = {}
+        self.corpus_stats = {}
+        self.transition_priors = None
+        self.response_bundle = None
+        self.intent_backend = os.environ.get('INTENT_BACKEND', 'tfidf')
+        self.embedding_classifier = None
+        self.language_identifier = LanguageIdentifier()
+        self.degraded_cache = OrderedDict()
+        self.degraded_cache_lock = threading.Lock()
+        self.degraded_cache_size = 1024
         
     def preprocess_text(self, text):
         """Preprocess text for better understanding"""
@@ -41,8 +79,8 @@ class SkillHighChatbot:
         text = str(text).lower()
         
         # Simple preprocessing - just lowercase and basic cleaning
-        text = re.sub(r'[^\w\s]', ' ', text)  # Keep alphanumeric and spaces
-        text = re.sub(r'\s+', ' ', text)      # Replace multiple spaces with single space
+        text = NON_WORD_PATTERN.sub(' ', text)  # Keep alphanumeric and spaces
+        text = WHITESPACE_PATTERN.sub(' ', text)  # Replace multiple spaces with single space
         text = text.strip()
         
         # If text is too short, return as is
@@ -65,26 +103,60 @@ class SkillHighChatbot:
             df['Intent'] = df['Intent'].astype(str)
             df['Response'] = df['Response'].astype(str)
             
-            # Preprocess texts
-            df['processed_text'] = df['Text'].apply(self.preprocess_text)
+            # Preprocess texts and collapse duplicate utterances into weighted rows
+            corpus = ingest_corpus(df, self.preprocess_text)
+            self.corpus_stats = corpus.stats
+            print(f"Training on {corpus.stats['training_rows']} of {corpus.stats['rows']} rows "
+                  f"({corpus.stats['exact_duplicates']} exact and {corpus.stats['near_duplicates']} near duplicates collapsed)")
             
             # Prepare features and labels
-            X = self.vectorizer.fit_transform(df['processed_text'])
-            y = df['Intent']
+            X = self.vectorizer.fit_transform(corpus.texts)
+            y = corpus.labels
             
             # Train the classifier
-            self.intent_classifier.fit(X, y)
-            self.is_trained = True
+            self.intent_classifier.fit(X, y, sample_weight=corpus.weights)
+            
+            # Optional embedding backend; the TF-IDF model stays trained as the fallback
+            self.embedding_classifier = None
+            if self.intent_backend == 'embedding':
+                embedding_classifier = EmbeddingIntentClassifier()
+                if embedding_classifier.available:
+                    self.embedding_classifier = embedding_classifier.fit(corpus.texts, y)
+                else:
+                    print("Embedding model not available locally, using the TF-IDF classifier")
+            
+            # Store responses for quick lookup from the normalized intent -> response table
+            self.responses = intern_responses(corpus.responses)
+            
+            # Pre-render every intent x prefix x language variant into an indexed table
+            self.response_bundle = build_response_bundle(
+                self.responses, data_path,
+                translate=lambda text, language: self.translate_text(text, target_lang=language)
+            )
+            with self.degraded_cache_lock:
+                self.degraded_cache.clear()
+            
+            # Local language identifier, with the training utterances added to the English profile
+            self.language_identifier = LanguageIdentifier({
+                'en': ENGLISH_SAMPLES + list(df['Text']),
+                'hinglish': HINGLISH_SAMPLES
+            })
             
-            # Store responses for quick lookup - handle duplicates
-            response_dict = {}
-            for _, row in df.iterrows():
-                intent = row['Intent']
-                response = row['Response']
-                if intent not in response_dict:
-                    response_dict[intent] = response
-            self.responses = response_dict
+            # Swap in the compact float32 model once it reproduces the sklearn predictions
+            self.compact_model = None
+            if self.use_compact_model:
+                self.compact(corpus.texts)
             
+            # Intent transition priors, scaled so no correctly classified training utterance is overturned
+            classes = self.intent_probabilities(corpus.texts[0])[0]
+            self.transition_priors = IntentTransitionPriors.calibrate(
+                classes, [self.intent_probabilities(text)[1] for text in corpus.texts], corpus.labels
+            )
+            print(f"Context prior scale: {self.transition_priors.scale:.3f} "
+                  f"(ambiguity margin {self.transition_priors.margin:.3f})")
+            
+            # Only report trained once responses, priors and the compact model are all in place
+            self.is_trained = True
             print("Model trained successfully!")
             return True
             
@@ -92,17 +164,99 @@ class SkillHighChatbot:
             print(f"Error training model: {e}")
             return False
     
-    def predict_intent(self, text):
-        """Predict intent from user input"""
+    def compact(self, texts):
+        """Replace the fitted vectorizer and classifier with a compact inference model"""
+        full_size = model_nbytes(self.vectorizer, self.intent_classifier)
+        
+        # Drop training-only state kept by older scikit-learn versions
+        if hasattr(self.vectorizer, 'stop_words_'):
+            del self.vectorizer.stop_words_
+        
+        model = CompactIntentModel(self.vectorizer, self.intent_classifier)
+        identical = verify_predictions(model, self.vectorizer, self.intent_classifier, texts)
+        
+        # The worker keeps the compact model plus fresh, unfitted estimators for the next training run
+        vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
+        classifier = MultinomialNB()
+        compact_size = model_nbytes(model, vectorizer, classifier)
+        
+        self.memory_report = {
+            'full_model_bytes': full_size,
+            'compact_model_bytes': compact_size,
+            'saved_bytes_per_worker': full_size - compact_size,
+            'predictions_identical': identical
+        }
+        
+        if not identical:
+            print("Compact model predictions differ, keeping the full model")
+            return False
+        if compact_size >= full_size:
+            print("Compact model is not smaller, keeping the full model")
+            return False
+        
+        # Release the fitted sklearn objects
+        self.compact_model = model
+        self.vectorizer = vectorizer
+        self.intent_classifier = classifier
+        
+        print(f"Compact model saves {self.memory_report['saved_bytes_per_worker'] / 1024:.1f} KB per worker")
+        return True
+    
+    def intent_probabilities(self, processed_text):
+        """Return (classes, probabilities) for a preprocessed text"""
+        if self.embedding_classifier is not None:
+            return self.embedding_classifier.classes, self.embedding_classifier.predict_proba(processed_text)
+        
+        if self.compact_model is not None:
+            vector = self.compact_model.transform(processed_text)
+            return self.compact_model.classes, self.compact_model.predict_proba(vector)
+        
+        X = self.vectorizer.transform([processed_text])
+        return self.intent_classifier.classes_, self.intent_classifier.predict_proba(X)[0]
+    
+    def get_recent_intents(self, user_id):
+        """Intents of the user's recent turns, oldest first"""
+        return [turn['intent'] for turn in self.state_store.get_session(user_id)]
+    
+    def predict_intent(self, text, user_id=None):
+        """Predict intent from user input, using session history when user_id is given"""
         if not self.is_trained:
             return "Unknown", 0.0
         
         processed_text = self.preprocess_text(text)
-        X = self.vectorizer.transform([processed_text])
-        intent = self.intent_classifier.predict(X)[0]
-        confidence = self.intent_classifier.predict_proba(X).max()
+        classes, proba = self.intent_probabilities(processed_text)
+        
+        # Lean towards the topic of the user's recent turns
+        if user_id is not None and self.transition_priors is not None:
+            proba = self.transition_priors.apply(proba, self.get_recent_intents(user_id))
         
-        # Fallback for simple greetings with low confidence
+        best = int(proba.argmax())
+        return self.greeting_fallback(processed_text, str(classes[best]), float(proba[best]))
+    
+    def predict_intent_batch(self, texts):
+        """Predict intents for many messages at once, without session context"""
+        if not self.is_trained:
+            return [("Unknown", 0.0) for _ in texts]
+        
+        processed = [self.preprocess_text(text) for text in texts]
+        if self.embedding_classifier is not None:
+            classes = self.embedding_classifier.classes
+            probas = self.embedding_classifier.predict_proba_batch(processed)
+        elif self.compact_model is not None:
+            classes = self.compact_model.classes
+            probas = [self.compact_model.predict_proba(self.compact_model.transform(text)) for text in processed]
+        else:
+            classes = self.intent_classifier.classes_
+            probas = self.intent_classifier.predict_proba(self.vectorizer.transform(processed))
+        
+        results = []
+        for text, proba in zip(processed, probas):
+            best = int(proba.argmax())
+            results.append(self.greeting_fallback(text, str(classes[best]), float(proba[best])))
+        return results
+    
+    def greeting_fallback(self, processed_text, intent, confidence):
+        """Fallback for simple greetings with low confidence"""
         if confidence < 0.3:
             text_lower = processed_text.lower().strip()
             greeting_words = ['hi', 'hello', 'hey', 'hii', 'hlo', 'good morning', 'good afternoon', 'good evening']
@@ -131,59 +285,99 @@ class SkillHighChatbot:
         except:
             return text
     
-    def get_contextual_response(self, intent, sentiment, user_id=None):
+    def choose_prefix(self, sentiment):
+        """Pick an empathy prefix index for the sentiment (0 means no prefix)"""
+        if sentiment == "negative":
+            return random.randint(1, self.response_bundle.prefix_count)
+        return 0
+    
+    def get_contextual_response(self, intent, sentiment, user_id=None, language="en", prefix_index=None):
         """Get response based on intent and sentiment"""
-        base_response = self.responses.get(intent, "I'm sorry, I didn't understand that. Could you please rephrase?")
+        if self.response_bundle is None:
+            return "I'm sorry, I didn't understand that. Could you please rephrase?"
         
         # Add empathetic responses based on sentiment
-        if sentiment == "negative":
-            empathy_prefixes = [
-                "I understand your concern. ",
-                "I'm here to help with that. ",
-                "Let me clarify that for you. "
-            ]
-            import random
-            base_response = random.choice(empathy_prefixes) + base_response
+        if prefix_index is None:
+            prefix_index = self.choose_prefix(sentiment)
         
-        return base_response
+        return self.response_bundle.render(intent, prefix_index, language)
+    
+    def supported_languages(self):
+        """Language codes the chatbot can answer in"""
+        if self.response_bundle is None:
+            return sorted(SUPPORTED_LANGUAGES)
+        return sorted(self.response_bundle.languages)
     
     def update_session_memory(self, user_id, intent, response):
-        """Update session memory for contextual conversations"""
-        if user_id not in self.session_memory:
-            self.session_memory[user_id] = []
-        
-        self.session_memory[user_id].append({
+        """Update session memory for contextual conversations (the store keeps the last 5)"""
+        self.state_store.append_turn(user_id, {
             'intent': intent,
             'response': response,
-            'timestamp': pd.Timestamp.now()
+            'timestamp': pd.Timestamp.now().isoformat()
         })
+    
+    def get_session(self, user_id):
+        """A user's recent turns, oldest first"""
+        return self.state_store.get_session(user_id)
+    
+    def get_session_version(self, user_id):
+        """Version of a user's session data (0 if never written)"""
+        return self.state_store.session_version(user_id)
+    
+    def clear_session(self, user_id):
+        """Remove a user's session history"""
+        self.state_store.clear_session(user_id)
+    
+    def prepare_input(self, message, language="en", stages=None):
+        """English text for classification; Latin-script English and Hinglish input never reach the translation service"""
+        if language == "en":
+            return message
         
-        # Keep only last 5 interactions
-        if len(self.session_memory[user_id]) > 5:
-            self.session_memory[user_id] = self.session_memory[user_id][-5:]
+        with stage(stages, 'detect_language'):
+            detected = self.language_identifier.detect(message)
+        if detected == 'hinglish':
+            with stage(stages, 'normalize_input'):
+                return normalize_hinglish(message)
+        if detected != 'en':
+            with stage(stages, 'translate_input'):
+                return self.translate_text(message, target_lang='en')
+        return message
     
-    def get_response(self, message, user_id="default", language="en"):
-        """Main function to get chatbot response"""
+    def get_response(self, message, user_id="default", language="en", trace=None):
+        """Main function to get chatbot response
+        
+        If a trace dict is given, per-stage timings are recorded in trace['stages'],
+        the English text that was classified in trace['prepared_text'] and a swallowed
+        exception in trace['error'].
+        """
+        stages = trace.setdefault('stages', {}) if trace is not None else None
         try:
             # Translate input if needed
-            if language != "en":
-                message = self.translate_text(message, target_lang='en')
+            message = self.prepare_input(message, language, stages)
+            if trace is not None:
+                trace['prepared_text'] = message
             
-            # Predict intent
-            intent, confidence = self.predict_intent(message)
+            # Predict intent in the context of the session
+            with stage(stages, 'predict_intent'):
+                intent, confidence = self.predict_intent(message, user_id)
             
             # Analyze sentiment
-            sentiment = self.analyze_sentiment(message)
+            with stage(stages, 'sentiment'):
+                sentiment = self.analyze_sentiment(message)
             
-            # Get contextual response
-            response = self.get_contextual_response(intent, sentiment, user_id)
+            # Get contextual response from the pre-rendered bundle
+            with stage(stages, 'render_response'):
+                prefix_index = self.choose_prefix(sentiment)
+                response = self.get_contextual_response(intent, sentiment, user_id, "en", prefix_index)
             
             # Update session memory
-            self.update_session_memory(user_id, intent, response)
+            with stage(stages, 'session_update'):
+                self.update_session_memory(user_id, intent, response)
             
-            # Translate response if needed
+            # Localized variants are translated once and then served from the bundle
             if language != "en":
-                response = self.translate_text(response, target_lang=language)
+                with stage(stages, 'translate_response'):
+                    response = self.get_contextual_response(intent, sentiment, user_id, language, prefix_index)
             
             return {
                 'response': response,
@@ -193,6 +387,8 @@ class SkillHighChatbot:
             }
             
         except Exception as e:
+            if trace is not None:
+                trace['error'] = traceback.format_exc()
             return {
                 'response': "I'm sorry, I encountered an error. Please try again.",
                 'intent': 'Error',
@@ -200,6 +396,49 @@ class SkillHighChatbot:
                 'sentiment': 'neutral'
             }
 
+    def get_degraded_response(self, message):
+        """Cheap English-only response used under load: no translation, sentiment or session update"""
+        key = self.preprocess_text(message)
+        with self.degraded_cache_lock:
+            cached = self.degraded_cache.get(key)
+            if cached is not None:
+                self.degraded_cache.move_to_end(key)
+                return dict(cached)
+        
+        intent, confidence = self.predict_intent(message)
+        result = {
+            'response': self.get_contextual_response(intent, "neutral"),
+            'intent': intent,
+            'confidence': confidence,
+            'sentiment': 'neutral'
+        }
+        
+        with self.degraded_cache_lock:
+            self.degraded_cache[key] = result
+            while len(self.degraded_cache) > self.degraded_cache_size:
+                self.degraded_cache.popitem(last=False)
+        return dict(result)
+    
+    def warm_up(self, messages=WARMUP_MESSAGES):
+        """Run a synthetic batch through get_response to pay first-call costs up front"""
+        user_id = "__warmup__"
+        latencies = []
+        
+        for message in messages:
+            start = time.perf_counter()
+            self.get_response(message, user_id)
+            latencies.append((time.perf_counter() - start) * 1000)
+        
+        # Warm-up turns must not show up as a real session
+        self.state_store.clear_session(user_id)
+        
+        return {
+            'messages': len(messages),
+            'first_request_ms': round(latencies[0], 2) if latencies else 0.0,
+            'last_request_ms': round(latencies[-1], 2) if latencies else 0.0,
+            'total_ms': round(sum(latencies), 2)
+        }
+
 # Global chatbot instance
 chatbot = SkillHighChatbot()
 
@@ -0,0 +1,267 @@
+# Client SDK for the SkillHigh Chatbot API
+# Shared by demo_app.py and cli_chat.py so every front end talks to one API process
+
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+
+try:
+    HTTPX_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+    HTTPX_TRANSPORT_ERRORS = (httpx.TransportError,)
+except AttributeError:
+    # httpx < 0.14 (pinned by googletrans) raises httpcore's exceptions directly
+    import httpcore
+    HTTPX_CONNECT_ERRORS = (httpcore.ConnectError, httpcore.ConnectTimeout)
+    HTTPX_TRANSPORT_ERRORS = (httpcore.NetworkError, httpcore.TimeoutException, httpx.HTTPError)
+
+DEFAULT_API_URL = "http://localhost:5000"
+
+# Statuses that mean the request was not handled and is safe to send again
+RETRY_STATUSES = (429, 502, 503)
+
+# A gateway timeout or read timeout may come after the server handled the request,
+# so only idempotent methods are retried on those
+IDEMPOTENT_METHODS = ("GET", "HEAD")
+IDEMPOTENT_RETRY_STATUSES = (504,)
+
+# Longest Retry-After the client is willing to wait
+MAX_RETRY_AFTER = 30.0
+
+
+def backoff_delay(attempt, base_delay=0.2, max_delay=2.0):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def is_retryable_status(method, status_code):
+    """Whether a response status means the request can be sent again"""
+    if status_code in RETRY_STATUSES:
+        return True
+    return method.upper() in IDEMPOTENT_METHODS and status_code in IDEMPOTENT_RETRY_STATUSES
+
+
+def retry_delay(response, attempt):
+    """Honour Retry-After on 429/503, otherwise back off"""
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return min(MAX_RETRY_AFTER, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return backoff_delay(attempt)
+
+
+def is_connect_error(error):
+    """Whether a requests exception happened before anything was sent"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError):
+        return False
+    # Connection refused / DNS failures arrive as a MaxRetryError wrapping a connect error;
+    # a dropped connection mid-response does not
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, ConnectTimeoutError)
+
+
+def group_batch(messages, user_id, language):
+    """Group batch items per user, keeping their positions and order"""
+    groups = {}
+    for position, item in enumerate(messages):
+        if isinstance(item, dict):
+            item = {"user_id": user_id, "language": language, **item}
+        else:
+            item = {"message": item, "user_id": user_id, "language": language}
+        groups.setdefault(item["user_id"], []).append((position, item))
+    return list(groups.values())
+
+
+class ChatClient:
+    """Keep-alive client for the chat API with a pooled session and bounded retries"""
+
+    def __init__(self, api_url=DEFAULT_API_URL, timeout=10, max_retries=3, pool_size=10):
+        self.api_url = api_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.etag_cache = {}
+
+        # One session keeps TCP connections open between calls
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _request(self, method, path, timeout=None, **kwargs):
+        """Send a request, retrying only failures where the server cannot have handled it
+
+        Non-idempotent requests (POST /chat) are retried on connect errors, 429, 502 and 503;
+        GETs are also retried on read timeouts, dropped connections and 504.
+        """
+        url = f"{self.api_url}{path}"
+        timeout = timeout or self.timeout
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+                if not is_retryable_status(method, response.status_code) or attempt == self.max_retries:
+                    return response
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt == self.max_retries or not (idempotent or is_connect_error(e)):
+                    raise
+            time.sleep(retry_delay(response, attempt))
+
+    def chat(self, message, user_id="default", language="en"):
+        """Send one chat message and return the JSON reply"""
+        response = self._request("POST", "/chat", json={
+            "message": message,
+            "user_id": user_id,
+            "language": language
+        })
+        return response.json()
+
+    def chat_batch(self, messages, user_id="default", language="en"):
+        """Send several messages over the pooled connections and return replies in input order
+
+        Items are message strings or {"message", "user_id", "language"} dicts. One user's
+        messages are sent one after another, in order, so their session turns stay ordered;
+        different users are sent concurrently.
+        """
+        if not messages:
+            return []
+
+        replies = [None] * len(messages)
+
+        def send(group):
+            for position, item in group:
+                replies[position] = self.chat(item["message"], item["user_id"], item["language"])
+
+        groups = group_batch(messages, user_id, language)
+        with ThreadPoolExecutor(max_workers=min(self.pool_size, len(groups))) as executor:
+            list(executor.map(send, groups))
+        return replies
+
+    def _get_revalidated(self, path, timeout=None):
+        """GET a JSON resource, reusing the cached copy when the server answers 304"""
+        cached = self.etag_cache.get(path)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        response = self._request("GET", path, timeout=timeout, headers=headers)
+
+        if response.status_code == 304 and cached:
+            return cached[1]
+
+        data = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            self.etag_cache[path] = (etag, data)
+        return data
+
+    def analytics(self):
+        """Get usage analytics"""
+        return self._get_revalidated("/analytics", timeout=5)
+
+    def health(self):
+        """Get API health status"""
+        return self._request("GET", "/health", timeout=5).json()
+
+    def get_session(self, user_id):
+        """Get conversation history for a user"""
+        return self._get_revalidated(f"/session/{user_id}")
+
+    def clear_session(self, user_id):
+        """Clear conversation history for a user"""
+        self.etag_cache.pop(f"/session/{user_id}", None)
+        return self._request("DELETE", f"/session/{user_id}").json()
+
+    def is_available(self):
+        """Check whether the API is reachable"""
+        try:
+            self.session.get(f"{self.api_url}/health", timeout=2)
+            return True
+        except requests.exceptions.RequestException:
+            return False
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncChatClient:
+    """Async variant of ChatClient built on a shared httpx.AsyncClient"""
+
+    def __init__(self, api_url=DEFAULT_API_URL, timeout=10, max_retries=3, max_concurrency=10):
+        self.api_url = api_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self.client = httpx.AsyncClient(base_url=self.api_url, timeout=timeout)
+
+    async def _request(self, method, path, **kwargs):
+        """Send a request with the same retry rules as ChatClient._request"""
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = await self.client.request(method, path, **kwargs)
+                if not is_retryable_status(method, response.status_code) or attempt == self.max_retries:
+                    return response
+            except HTTPX_TRANSPORT_ERRORS as e:
+                if attempt == self.max_retries or not (idempotent or isinstance(e, HTTPX_CONNECT_ERRORS)):
+                    raise
+            await asyncio.sleep(retry_delay(response, attempt))
+
+    async def chat(self, message, user_id="default", language="en"):
+        """Send one chat message and return the JSON reply"""
+        response = await self._request("POST", "/chat", json={
+            "message": message,
+            "user_id": user_id,
+            "language": language
+        })
+        return response.json()
+
+    async def chat_batch(self, messages, user_id="default", language="en"):
+        """Send several messages, in order per user and concurrently across users"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        replies = [None] * len(messages)
+
+        async def send(group):
+            async with semaphore:
+                for position, item in group:
+                    replies[position] = await self.chat(item["message"], item["user_id"], item["language"])
+
+        await asyncio.gather(*(send(group) for group in group_batch(messages, user_id, language)))
+        return replies
+
+    async def analytics(self):
+        """Get usage analytics"""
+        response = await self._request("GET", "/analytics")
+        return response.json()
+
+    async def health(self):
+        """Get API health status"""
+        response = await self._request("GET", "/health")
+        return response.json()
+
+    async def close(self):
+        """Close pooled connections"""
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,125 @@
+# Compact inference model for SkillHigh Chatbot
+# Replaces the fitted TfidfVectorizer + MultinomialNB pair with flat float32 arrays
+
+import re
+import sys
+import types
+import numpy as np
+
+
+class CompactIntentModel:
+    """Frozen, low-memory copy of a fitted TF-IDF + Naive Bayes intent model"""
+
+    def __init__(self, vectorizer, classifier):
+        # Sorted-array vocabulary: sklearn assigns column indices in sorted term order,
+        # so the position of a term in this array is its feature index. UTF-8 bytes sort in
+        # the same order and take a quarter of the fixed-width unicode array
+        vocabulary = vectorizer.vocabulary_
+        terms = sorted(vocabulary, key=vocabulary.get)
+        self.terms = np.array([term.encode('utf-8') for term in terms], dtype=np.bytes_)
+        self.token_pattern = re.compile(vectorizer.token_pattern)
+        self.lowercase = vectorizer.lowercase
+
+        # Training-only state is not copied; weights are stored as float32
+        self.idf = vectorizer.idf_.astype(np.float32)
+        self.feature_log_prob = classifier.feature_log_prob_.astype(np.float32)
+        self.class_log_prior = classifier.class_log_prior_.astype(np.float32)
+        self.classes = [sys.intern(str(label)) for label in classifier.classes_]
+
+    def lookup(self, tokens):
+        """Map tokens to feature indices, skipping out-of-vocabulary tokens"""
+        if not tokens or len(self.terms) == 0:
+            return np.empty(0, dtype=np.intp)
+
+        tokens = np.array([token.encode('utf-8') for token in tokens], dtype=np.bytes_)
+        positions = np.searchsorted(self.terms, tokens)
+        positions = np.minimum(positions, len(self.terms) - 1)
+        return positions[self.terms[positions] == tokens]
+
+    def transform(self, text):
+        """Build the L2-normalised TF-IDF vector for one preprocessed text"""
+        if self.lowercase:
+            text = text.lower()
+
+        vector = np.zeros(len(self.terms), dtype=np.float32)
+        indices = self.lookup(self.token_pattern.findall(text))
+        np.add.at(vector, indices, 1.0)
+        vector *= self.idf
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def predict_proba(self, vector):
+        """Class probabilities for a single TF-IDF vector"""
+        joint_log_likelihood = self.feature_log_prob @ vector + self.class_log_prior
+        joint_log_likelihood -= joint_log_likelihood.max()
+        proba = np.exp(joint_log_likelihood)
+        return proba / proba.sum()
+
+    def predict(self, text):
+        """Return (intent, confidence) for one preprocessed text"""
+        proba = self.predict_proba(self.transform(text))
+        best = int(proba.argmax())
+        return self.classes[best], float(proba[best])
+
+    def nbytes(self):
+        """Memory held by the compact model in bytes"""
+        return model_nbytes(self)
+
+
+# Shared interpreter objects that a model references but does not own
+NOT_OWNED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def model_nbytes(*objects):
+    """Memory held by a group of model objects and everything they reference, in bytes
+
+    Sums sys.getsizeof over the reachable containers, instance dicts and arrays (numpy
+    includes the data buffer an array owns); objects shared between them count once.
+    """
+    seen = set()
+    pending = list(objects)
+    total = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, NOT_OWNED):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+
+        if isinstance(obj, np.ndarray):
+            if obj.base is not None:
+                pending.append(obj.base)
+            if obj.dtype == object:
+                pending.extend(obj.ravel().tolist())
+        elif isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            pending.extend(obj)
+        if hasattr(obj, '__dict__') and not isinstance(obj, np.ndarray):
+            pending.append(obj.__dict__)
+    return total
+
+
+def intern_responses(responses):
+    """Intern response strings so repeated texts share one object per worker"""
+    return {sys.intern(str(intent)): sys.intern(str(response)) for intent, response in responses.items()}
+
+
+def verify_predictions(compact_model, vectorizer, classifier, texts, tolerance=1e-5):
+    """Check that the compact model reproduces the sklearn predictions on texts"""
+    if len(texts) == 0:
+        return True
+
+    X = vectorizer.transform(texts)
+    expected_intents = classifier.predict(X)
+    expected_confidences = classifier.predict_proba(X).max(axis=1)
+
+    for text, expected_intent, expected_confidence in zip(texts, expected_intents, expected_confidences):
+        intent, confidence = compact_model.predict(text)
+        if intent != expected_intent or abs(confidence - expected_confidence) > tolerance:
+            return False
+    return True
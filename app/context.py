@@ -0,0 +1,133 @@
+# Multi-turn intent resolution for SkillHigh Chatbot
+# Precomputed intent transition priors that resolve ambiguous follow-up messages
+
+import numpy as np
+
+# Intents that carry no topic, so they add no prior of their own
+SOCIAL_INTENTS = ('Greeting', 'Gratitude', 'Goodbye')
+
+# Opening a conversation again in the middle of a topic is unlikely
+OPENING_INTENTS = ('Greeting',)
+
+# Any answer may be followed by thanks or a goodbye
+CLOSING_INTENTS = ('Gratitude', 'Goodbye')
+
+# Questions that typically follow each topic; every topic is also followed by itself
+FOLLOW_UPS = {
+    'AskCourses': ('AskDuration', 'AskFees', 'AskMode', 'AskPrerequisites', 'AskEnrollment', 'AskCertification'),
+    'AskFees': ('AskRefund', 'AskEnrollment', 'AskDuration', 'AskCourses'),
+    'AskDuration': ('AskFees', 'AskMode', 'AskCertification'),
+    'AskMode': ('AskDuration', 'AskFees', 'AskEnrollment'),
+    'AskPrerequisites': ('AskEnrollment', 'AskCourses', 'AskDuration'),
+    'AskEnrollment': ('AskFees', 'AskPrerequisites', 'AskRefund'),
+    'AskCertification': ('AskPlacement', 'AskInternship', 'AskDuration'),
+    'AskInternship': ('AskPlacement', 'AskDuration', 'AskCertification', 'AskFees'),
+    'AskPlacement': ('AskInternship', 'AskCertification', 'AskFees'),
+    'AskRefund': ('AskFees', 'AskEnrollment'),
+    'AskAbout': ('AskCourses', 'AskCapabilities', 'AskPlacement'),
+    'AskCapabilities': ('AskCourses', 'AskHelp', 'AskAbout'),
+    'AskHelp': ('AskCapabilities', 'AskCourses'),
+}
+
+
+class IntentTransitionPriors:
+    """Log prior of the next intent given recent turns, applied only to ambiguous messages
+
+    matrix[i, j] is log P(next = j | previous = i) relative to a uniform prior, built from
+    declared follow-ups: an expected next intent (the topic itself, its follow-ups, or a
+    closer) gets follow_up_weight, an opener gets opening_weight and any other intent 1.
+    Social previous turns add nothing. The log priors of the recent topical turns are
+    averaged with decay, multiplied by scale and only added when the current message's
+    top-2 log-probability margin is below margin.
+    """
+
+    def __init__(self, classes, scale=1.0, margin=None, turns=3, decay=0.5, follow_ups=FOLLOW_UPS,
+                 follow_up_weight=4.0, opening_weight=0.25, social_intents=SOCIAL_INTENTS):
+        self.classes = list(classes)
+        self.index = {intent: i for i, intent in enumerate(self.classes)}
+        self.topical = {intent for intent in self.classes if intent not in social_intents}
+        self.turns = turns
+        self.decay_weights = (decay ** np.arange(turns)).astype(np.float32)
+        self.matrix = self.transition_matrix(follow_ups, follow_up_weight, opening_weight)
+        self.scale = float(scale)
+        self.fixed_margin = margin
+        self.margin = self.default_margin() if margin is None else float(margin)
+
+    def transition_matrix(self, follow_ups, follow_up_weight, opening_weight):
+        """Log transition priors, one row per previous intent (zero rows for social intents)"""
+        size = len(self.classes)
+        matrix = np.zeros((size, size), dtype=np.float32)
+        for intent in self.topical:
+            weights = np.ones(size)
+            expected = (intent,) + tuple(follow_ups.get(intent, ())) + CLOSING_INTENTS
+            for follower in expected:
+                if follower in self.index:
+                    weights[self.index[follower]] = follow_up_weight
+            for opener in OPENING_INTENTS:
+                if opener in self.index:
+                    weights[self.index[opener]] = opening_weight
+            matrix[self.index[intent]] = np.log(weights * size / weights.sum())
+        return matrix
+
+    def default_margin(self):
+        """Largest log-odds swing the scaled priors can cause; clearer messages are never touched"""
+        swing = (self.matrix.max(axis=1) - self.matrix.min(axis=1)).max() if len(self.classes) else 0.0
+        return self.scale * float(swing)
+
+    @classmethod
+    def calibrate(cls, classes, probas, labels, safety=0.9, **kwargs):
+        """Largest scale (at most 1) that never overturns a correct prediction on the training utterances
+
+        The applied prior is an average of matrix rows, so a correctly classified utterance
+        is safe as long as no single row lifts another intent over the true class by more
+        than its log-probability gap.
+        """
+        instance = cls(classes, **kwargs)
+        rows = instance.matrix[[instance.index[intent] for intent in sorted(instance.topical)]]
+        scale = 1.0
+        for proba, label in zip(probas, labels):
+            log_proba = np.log(np.maximum(np.asarray(proba, dtype=np.float64), 1e-12))
+            true_index = instance.index.get(label)
+            if true_index is None or int(log_proba.argmax()) != true_index or not len(rows):
+                continue
+            lift = (rows - rows[:, [true_index]]).max(axis=0)
+            gaps = log_proba[true_index] - log_proba
+            risky = lift > 0
+            if risky.any():
+                scale = min(scale, safety * float((gaps[risky] / lift[risky]).min()))
+
+        instance.scale = max(0.0, scale)
+        if instance.fixed_margin is None:
+            instance.margin = instance.default_margin()
+        return instance
+
+    def log_prior(self, previous_intents):
+        """Decay-weighted average of the transition rows of the most recent topical turns"""
+        log_prior, total = None, 0.0
+        for weight, intent in zip(self.decay_weights, reversed(previous_intents[-self.turns:])):
+            if intent in self.topical:
+                if log_prior is None:
+                    log_prior = np.zeros(len(self.classes), dtype=np.float32)
+                log_prior += weight * self.matrix[self.index[intent]]
+                total += weight
+        return log_prior * (self.scale / total) if log_prior is not None else None
+
+    def is_ambiguous(self, proba):
+        """Whether the top two classes are within margin of each other in log space"""
+        if len(proba) < 2:
+            return False
+        second, first = np.partition(np.maximum(proba, 1e-12), -2)[-2:]
+        return np.log(first) - np.log(second) < self.margin
+
+    def apply(self, proba, previous_intents):
+        """Re-weight an ambiguous message's class probabilities with the session's recent intents"""
+        if self.scale <= 0 or not self.is_ambiguous(proba):
+            return proba
+        log_prior = self.log_prior(previous_intents)
+        if log_prior is None:
+            return proba
+
+        log_posterior = np.log(np.maximum(proba, 1e-12)) + log_prior
+        log_posterior -= log_posterior.max()
+        posterior = np.exp(log_posterior)
+        return posterior / posterior.sum()
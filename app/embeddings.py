@@ -0,0 +1,175 @@
+# Embedding-based intent classifier for SkillHigh Chatbot
+# Optional CPU backend: sentence-transformers encodings with an int8 nearest-neighbour index
+
+import hashlib
+import os
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+import numpy as np
+
+DEFAULT_MODEL_PATH = os.environ.get('EMBEDDING_MODEL_PATH', 'models/all-MiniLM-L6-v2')
+DEFAULT_INDEX_PATH = 'models/embedding_index.npz'
+
+
+def load_sentence_encoder(model_path):
+    """Load a local sentence-transformers model on CPU, or return None if unavailable"""
+    if not os.path.isdir(model_path):
+        return None
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+
+    try:
+        model = SentenceTransformer(model_path, device='cpu')
+    except Exception as e:
+        print(f"Error loading embedding model: {e}")
+        return None
+
+    return lambda texts, batch_size: model.encode(
+        texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False
+    )
+
+
+def quantize(vectors):
+    """Symmetric per-row int8 quantization; returns (codes, scales)"""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.round(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def normalize_rows(vectors):
+    """L2-normalize rows so dot products are cosine similarities"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class EmbeddingIntentClassifier:
+    """Nearest-neighbour intent classifier over int8-quantized utterance embeddings"""
+
+    def __init__(self, encoder=None, model_path=DEFAULT_MODEL_PATH, index_path=DEFAULT_INDEX_PATH,
+                 batch_size=32, cache_size=4096, temperature=0.05):
+        self.model_path = model_path
+        self.index_path = index_path
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.temperature = temperature
+        self.encoder = encoder if encoder is not None else load_sentence_encoder(model_path)
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.codes = None
+        self.scales = None
+        self.labels = None
+        self.classes = []
+
+    @property
+    def available(self):
+        """Whether an encoder could be loaded"""
+        return self.encoder is not None
+
+    def fingerprint(self, texts, labels):
+        """Identify an index by model and training data"""
+        digest = hashlib.sha1(self.model_path.encode('utf-8'))
+        for text, label in zip(texts, labels):
+            digest.update(f"{label}\t{text}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def encode(self, texts):
+        """Encode normalized texts in batches, reusing cached embeddings"""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        vectors = {}
+        with self.cache_lock:
+            for text in texts:
+                vector = self.cache.get(text)
+                if vector is not None:
+                    self.cache.move_to_end(text)
+                    vectors[text] = vector
+
+        # Encoding runs outside the lock; concurrent misses on the same text just encode it twice
+        missing = [text for text in dict.fromkeys(texts) if text not in vectors]
+        if missing:
+            encoded = normalize_rows(self.encoder(missing, self.batch_size))
+            with self.cache_lock:
+                for text, vector in zip(missing, encoded):
+                    vectors[text] = vector
+                    self.cache[text] = vector
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+
+        return np.stack([vectors[text] for text in texts])
+
+    def fit(self, texts, labels):
+        """Build the quantized index, reusing a persisted one when the training data is unchanged"""
+        labels = [str(label) for label in labels]
+        self.classes = sorted(set(labels))
+        class_index = {intent: i for i, intent in enumerate(self.classes)}
+        self.labels = np.array([class_index[label] for label in labels], dtype=np.intp)
+        fingerprint = self.fingerprint(texts, labels)
+
+        stored = self.load_index(fingerprint)
+        if stored is not None:
+            self.codes, self.scales = stored
+            return self
+
+        self.codes, self.scales = quantize(self.encode(list(texts)))
+        self.save_index(fingerprint)
+        return self
+
+    def load_index(self, fingerprint):
+        """(codes, scales) from the persisted index if it matches; unreadable files are a cache miss"""
+        if not self.index_path or not os.path.exists(self.index_path):
+            return None
+        try:
+            with np.load(self.index_path) as stored:
+                if str(stored['fingerprint']) != fingerprint:
+                    return None
+                return stored['codes'], stored['scales']
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile) as e:
+            print(f"Ignoring unreadable embedding index {self.index_path}: {e}")
+            return None
+
+    def save_index(self, fingerprint):
+        """Persist the index atomically so concurrent workers never read a partial file"""
+        if not self.index_path:
+            return
+        directory = os.path.dirname(self.index_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.npz.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, codes=self.codes, scales=self.scales, fingerprint=fingerprint)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            print(f"Could not save embedding index: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def predict_proba_batch(self, texts):
+        """Class probabilities for a batch of normalized texts"""
+        if len(texts) == 0:
+            return np.empty((0, len(self.classes)), dtype=np.float32)
+
+        queries = self.encode(list(texts))
+        similarities = (queries @ self.codes.T.astype(np.float32)) * self.scales
+
+        # Score each intent by its closest training utterance
+        n_classes = len(self.classes)
+        class_scores = np.full((len(queries), n_classes), -np.inf, dtype=np.float32)
+        for i in range(n_classes):
+            class_scores[:, i] = similarities[:, self.labels == i].max(axis=1)
+
+        logits = class_scores / self.temperature
+        logits -= logits.max(axis=1, keepdims=True)
+        proba = np.exp(logits)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, text):
+        """Class probabilities for one normalized text"""
+        return self.predict_proba_batch([text])[0]
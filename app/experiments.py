@@ -0,0 +1,159 @@
+# Candidate model evaluation for SkillHigh Chatbot
+# Shadow scoring of sampled /chat traffic off the response path, and sticky A/B serving
+
+import json
+import os
+import queue
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+
+from app.chatbot import SkillHighChatbot
+
+
+class ModelExperiment:
+    """Serves a traffic split from a candidate model and shadow-scores a sample of the rest"""
+
+    def __init__(self, primary, candidate, sample_rate=0.0, candidate_split=0.0,
+                 log_path=None, queue_size=100):
+        self.primary = primary
+        self.candidate = candidate
+        self.sample_rate = sample_rate
+        self.candidate_split = candidate_split
+        self.log_path = log_path
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.disagreements = Counter()
+        self.latency_ms = {'primary': 0.0, 'candidate': 0.0}
+
+        # Candidate-served users keep one session whichever model answers them
+        self.candidate.state_store = primary.state_store
+
+        if log_path:
+            directory = os.path.dirname(log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._worker = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+        self._worker.start()
+
+    def route(self, user_id):
+        """Return (variant, model) for a user; the assignment is stable per user_id"""
+        bucket = zlib.crc32(str(user_id).encode('utf-8')) % 10000
+        if bucket < self.candidate_split * 10000:
+            return 'candidate', self.candidate
+        return 'primary', self.primary
+
+    def submit(self, prepared_text, language, result):
+        """Queue a primary-served request for shadow scoring; never blocks the caller
+
+        prepared_text is the English text the primary classified (trace['prepared_text']),
+        so shadow scoring never translates again.
+        """
+        if prepared_text is None or self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return False
+        try:
+            self.jobs.put_nowait((prepared_text, language, result.get('intent')))
+        except queue.Full:
+            with self.lock:
+                self.counts['dropped'] += 1
+            return False
+        return True
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                self._score(*job)
+            except Exception as e:
+                print(f"Shadow scoring error: {e}")
+                with self.lock:
+                    self.counts['errors'] += 1
+            finally:
+                self.jobs.task_done()
+
+    def _score(self, text, language, served_intent):
+        """Classify one prepared message with both models and record the comparison"""
+        # Both models classify the same text without session context on this thread
+        start = time.perf_counter()
+        primary_intent, primary_confidence = self.primary.predict_intent(text)
+        primary_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        candidate_intent, candidate_confidence = self.candidate.predict_intent(text)
+        candidate_ms = (time.perf_counter() - start) * 1000
+
+        agree = primary_intent == candidate_intent
+        with self.lock:
+            self.counts['scored'] += 1
+            self.latency_ms['primary'] += primary_ms
+            self.latency_ms['candidate'] += candidate_ms
+            if not agree:
+                self.counts['disagreements'] += 1
+                self.disagreements[f"{primary_intent} -> {candidate_intent}"] += 1
+
+        if not agree and self.log_path:
+            record = {
+                'timestamp': datetime.now().isoformat(),
+                'text': text[:200],
+                'language': language,
+                'served_intent': served_intent,
+                'primary': {'intent': primary_intent, 'confidence': round(float(primary_confidence), 4)},
+                'candidate': {'intent': candidate_intent, 'confidence': round(float(candidate_confidence), 4)},
+                'latency_delta_ms': round(candidate_ms - primary_ms, 3)
+            }
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def wait(self):
+        """Block until every queued shadow job has been scored"""
+        self.jobs.join()
+
+    def stats(self, top=10):
+        """Agreement and latency comparison so far"""
+        with self.lock:
+            scored = self.counts['scored']
+            primary_ms = self.latency_ms['primary'] / scored if scored else 0.0
+            candidate_ms = self.latency_ms['candidate'] / scored if scored else 0.0
+            return {
+                'sample_rate': self.sample_rate,
+                'candidate_split': self.candidate_split,
+                'scored': scored,
+                'pending': self.jobs.qsize(),
+                'dropped': self.counts['dropped'],
+                'errors': self.counts['errors'],
+                'agreement_rate': round(1 - self.counts['disagreements'] / scored, 4) if scored else None,
+                'mean_latency_ms': {
+                    'primary': round(primary_ms, 3),
+                    'candidate': round(candidate_ms, 3),
+                    'delta': round(candidate_ms - primary_ms, 3)
+                },
+                'top_disagreements': [
+                    {'intents': pair, 'count': count} for pair, count in self.disagreements.most_common(top)
+                ]
+            }
+
+
+def create_experiment(primary):
+    """Train the candidate model from environment settings; None when no experiment is configured"""
+    sample_rate = float(os.environ.get('SHADOW_SAMPLE_RATE', 0))
+    candidate_split = float(os.environ.get('CANDIDATE_TRAFFIC_SPLIT', 0))
+    if sample_rate <= 0 and candidate_split <= 0:
+        return None
+
+    candidate = SkillHighChatbot()
+    candidate.intent_backend = os.environ.get('CANDIDATE_INTENT_BACKEND', candidate.intent_backend)
+    if not candidate.train_model(os.environ.get('CANDIDATE_DATA', 'data/intents.csv')):
+        print("Candidate model could not be trained, experiment disabled")
+        return None
+    candidate.warm_up()
+
+    return ModelExperiment(
+        primary, candidate,
+        sample_rate=sample_rate,
+        candidate_split=candidate_split,
+        log_path=os.environ.get('SHADOW_LOG', 'logs/shadow_disagreements.jsonl'),
+        queue_size=int(os.environ.get('SHADOW_QUEUE_SIZE', 100))
+    )
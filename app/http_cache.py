@@ -0,0 +1,80 @@
+# HTTP caching helpers for SkillHigh Chatbot API read endpoints
+# Versioned JSON snapshots with ETag / If-None-Match and gzip compression
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from flask import current_app, request, Response
+
+# Payloads smaller than this are sent uncompressed
+GZIP_MIN_SIZE = 1024
+
+
+class Snapshot:
+    """Serialized JSON payload for one data version"""
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = hashlib.sha1(body).hexdigest()[:20]
+        self._gzipped = None
+
+    @property
+    def gzipped(self):
+        """Gzip-compressed body, built once per snapshot"""
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+
+class SnapshotCache:
+    """Bounded cache of snapshots keyed by resource name and version"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.snapshots = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, version, build_payload):
+        """Return the snapshot for (key, version), serializing the payload only on a miss"""
+        with self.lock:
+            cached = self.snapshots.get(key)
+            if cached is not None and cached[0] == version:
+                self.snapshots.move_to_end(key)
+                return cached[1]
+
+        snapshot = Snapshot(current_app.json.dumps(build_payload()).encode('utf-8'))
+        with self.lock:
+            self.snapshots[key] = (version, snapshot)
+            self.snapshots.move_to_end(key)
+            while len(self.snapshots) > self.max_entries:
+                self.snapshots.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, key):
+        """Drop the snapshot for a resource"""
+        with self.lock:
+            self.snapshots.pop(key, None)
+
+
+def cached_json_response(cache, key, version, build_payload):
+    """JSON response with ETag revalidation (304) and gzip for large payloads
+
+    The gzip and identity bodies are different representations, so each gets its own tag.
+    """
+    snapshot = cache.get(key, version, build_payload)
+    compressed = len(snapshot.body) >= GZIP_MIN_SIZE and 'gzip' in request.accept_encodings
+    etag = snapshot.etag + '-gz' if compressed else snapshot.etag
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif compressed:
+        response = Response(snapshot.gzipped, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(snapshot.body, mimetype='application/json')
+
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    response.set_etag(etag)
+    return response
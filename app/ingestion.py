@@ -0,0 +1,140 @@
+# Training corpus ingestion for SkillHigh Chatbot
+# Collapses exact and near-duplicate utterances (MinHash/LSH) into weighted rows
+# and normalizes responses into a separate intent -> response table
+
+import re
+import zlib
+import numpy as np
+
+# Mersenne prime for the MinHash permutations; products of two values below it fit in uint64
+MINHASH_PRIME = (1 << 31) - 1
+
+# Chat-style letter elongation ("hiii", "helloooo")
+REPEATED_LETTERS = re.compile(r'(\w)\1+')
+
+
+def shingles(text, size=3):
+    """Character n-grams of a text with boundary markers and elongations squeezed"""
+    text = '#' + REPEATED_LETTERS.sub(r'\1', text) + '#'
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class MinHasher:
+    """MinHash signatures from random affine permutations of shingle hashes"""
+
+    def __init__(self, num_perm=64, seed=13):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, MINHASH_PRIME, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self.b = rng.randint(0, MINHASH_PRIME, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def signature(self, shingle_set):
+        """MinHash signature of a set of shingles"""
+        hashes = np.array([zlib.crc32(s.encode('utf-8')) % MINHASH_PRIME for s in shingle_set], dtype=np.uint64)
+        permuted = (hashes[:, None] * self.a + self.b) % np.uint64(MINHASH_PRIME)
+        return permuted.min(axis=0)
+
+
+def lsh_candidate_pairs(signatures, bands):
+    """Pairs of rows sharing at least one LSH band bucket"""
+    rows_per_band = signatures.shape[1] // bands
+    pairs = set()
+    for band in range(bands):
+        buckets = {}
+        band_slice = signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+        for row, key in enumerate(map(bytes, band_slice)):
+            buckets.setdefault(key, []).append(row)
+        for members in buckets.values():
+            for i in range(len(members)):
+                for j in range(i + 1, len(members)):
+                    pairs.add((members[i], members[j]))
+    return pairs
+
+
+class IngestedCorpus:
+    """Deduplicated training rows with weights, a response table and statistics"""
+
+    def __init__(self, texts, labels, weights, responses, stats):
+        self.texts = texts
+        self.labels = labels
+        self.weights = weights
+        self.responses = responses
+        self.stats = stats
+
+
+def ingest_corpus(df, preprocess, threshold=0.7, num_perm=64, bands=16):
+    """Build a weighted, deduplicated corpus from a Text/Intent/Response dataframe"""
+    processed = [preprocess(text) for text in df['Text']]
+    intents = list(df['Intent'])
+
+    # Exact duplicates: same processed text and intent
+    rows = {}
+    for text, intent in zip(processed, intents):
+        rows[(text, intent)] = rows.get((text, intent), 0) + 1
+    keys = list(rows)
+    weights = np.array([rows[key] for key in keys], dtype=np.float64)
+
+    # Near duplicates: LSH candidates verified by estimated Jaccard similarity
+    hasher = MinHasher(num_perm=num_perm)
+    signatures = np.array([hasher.signature(shingles(text)) for text, _ in keys])
+    parent = list(range(len(keys)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    conflicts = []
+    for i, j in sorted(lsh_candidate_pairs(signatures, bands)):
+        similarity = float(np.mean(signatures[i] == signatures[j]))
+        if similarity < threshold:
+            continue
+        if keys[i][1] != keys[j][1]:
+            # Never merge across intents; these are labelling problems to report
+            conflicts.append({'texts': [keys[i][0], keys[j][0]], 'intents': [keys[i][1], keys[j][1]],
+                              'similarity': round(similarity, 3)})
+            continue
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    # The first utterance of each group represents it, weighted by the group size
+    group_weights = {}
+    for i in range(len(keys)):
+        root = find(i)
+        group_weights[root] = group_weights.get(root, 0.0) + weights[i]
+    representatives = sorted(group_weights)
+
+    # Responses: one entry per intent, the first one in the file
+    responses = {}
+    response_variants = {}
+    for intent, response in zip(intents, df['Response']):
+        responses.setdefault(intent, response)
+        response_variants.setdefault(intent, set()).add(response)
+
+    response_bytes = sum(len(str(response).encode('utf-8')) for response in df['Response'])
+    table_bytes = sum(len(str(response).encode('utf-8')) for response in responses.values())
+
+    stats = {
+        'rows': len(processed),
+        'unique_rows': len(keys),
+        'training_rows': len(representatives),
+        'exact_duplicates': len(processed) - len(keys),
+        'near_duplicates': len(keys) - len(representatives),
+        'intents': len(responses),
+        'response_bytes_in_rows': response_bytes,
+        'response_table_bytes': table_bytes,
+        'intents_with_multiple_responses': sorted(i for i, v in response_variants.items() if len(v) > 1),
+        'cross_intent_near_duplicates': conflicts
+    }
+
+    return IngestedCorpus(
+        texts=[keys[i][0] for i in representatives],
+        labels=[keys[i][1] for i in representatives],
+        weights=np.array([group_weights[i] for i in representatives]),
+        responses=responses,
+        stats=stats
+    )
@@ -0,0 +1,140 @@
+# Local language identification for SkillHigh Chatbot
+# Character n-gram classifier that lets English and Hinglish input skip translation
+
+import math
+import re
+import unicodedata
+from collections import Counter
+
+DEVANAGARI = re.compile(r'[ऀ-ॿ]')
+NON_LETTERS = re.compile(r'[^a-z\s]')
+WHITESPACE = re.compile(r'\s+')
+
+# Seed sentences for the English profile (the training corpus is added at train time)
+ENGLISH_SAMPLES = [
+    "what courses do you offer",
+    "how much does the course cost",
+    "tell me about the internship program",
+    "can i get a certificate after completing the course",
+    "how long is the course and is it online",
+    "i want to know about placements and jobs",
+    "how do i enroll and what are the prerequisites",
+    "thank you for the help, that was useful",
+    "is there any scholarship or installment plan",
+    "what is the refund policy if i drop out",
+]
+
+# Seed sentences for romanized Hindi (Hinglish)
+HINGLISH_SAMPLES = [
+    "aap kaun se course padhate ho",
+    "course ki fees kitni hai",
+    "mujhe internship ke baare mein batao",
+    "kya course ke baad certificate milega",
+    "course kitne mahine ka hai",
+    "kya classes online hain ya offline",
+    "admission kaise lena hai",
+    "mujhe job placement chahiye",
+    "kya refund milta hai agar main chhod doon",
+    "namaste aap kaise ho",
+    "dhanyavaad bahut madad mili",
+    "mujhe samajh nahi aa raha hai",
+    "kya iske liye pehle se coding aani chahiye",
+    "skillhigh kya hai aur aap kya karte ho",
+    "fees ek saath deni hogi ya kisto mein",
+    "mera naam likh lo main judna chahta hoon",
+    "achha theek hai phir milte hain",
+    "kya yahan data science sikhate hain",
+    "koi scholarship hai kya",
+    "batao na kitna time lagega",
+]
+
+# Word-level Hinglish -> English normalization for the intent classifier
+HINGLISH_TO_ENGLISH = {
+    'kya': 'what', 'kaun': 'which', 'kaunsa': 'which', 'kaunse': 'which',
+    'kaise': 'how', 'kab': 'when', 'kahan': 'where', 'kyun': 'why', 'kyon': 'why',
+    'kitni': 'how much', 'kitna': 'how much', 'kitne': 'how many',
+    'hai': 'is', 'hain': 'are', 'ho': 'are', 'tha': 'was',
+    'mujhe': 'i', 'main': 'i', 'mera': 'my', 'meri': 'my', 'aap': 'you', 'aapka': 'your', 'aapke': 'your',
+    'batao': 'tell me', 'bataiye': 'tell me', 'chahiye': 'need', 'chahta': 'want', 'chahti': 'want',
+    'milega': 'get', 'milta': 'get', 'milti': 'get', 'lena': 'take', 'dena': 'give', 'deni': 'pay',
+    'dete': 'give', 'karte': 'do', 'karna': 'do',
+    'baare': 'about', 'mein': 'in', 'ke': 'of', 'ki': 'of', 'ka': 'of', 'se': 'from', 'liye': 'for',
+    'baad': 'after', 'pehle': 'before', 'saath': 'with', 'ya': 'or', 'aur': 'and', 'nahi': 'not',
+    'mahine': 'months', 'mahina': 'month', 'din': 'days', 'saal': 'years',
+    'padhate': 'teach', 'sikhate': 'teach', 'seekhna': 'learn', 'judna': 'join', 'daakhila': 'admission',
+    'naukri': 'job', 'kaam': 'work', 'paisa': 'money', 'paise': 'money', 'wapas': 'back',
+    'namaste': 'hello', 'namaskar': 'hello', 'dhanyavaad': 'thank you', 'shukriya': 'thank you',
+    'alvida': 'goodbye', 'madad': 'help', 'samajh': 'understand',
+}
+
+
+def ngrams(text, n=3):
+    """Character n-grams of each word, with word boundary markers"""
+    grams = []
+    for word in text.split():
+        word = f" {word} "
+        grams.extend(word[i:i + n] for i in range(max(1, len(word) - n + 1)))
+    return grams
+
+
+def has_non_latin_letters(text):
+    """Whether the text contains letters from a script other than Latin"""
+    return any(ch.isalpha() and not unicodedata.name(ch, '').startswith('LATIN') for ch in text)
+
+
+def clean(text):
+    """Lowercase and keep only ASCII letters and spaces"""
+    return WHITESPACE.sub(' ', NON_LETTERS.sub(' ', str(text).lower())).strip()
+
+
+class LanguageIdentifier:
+    """Naive Bayes over character trigrams; Devanagari and other scripts are detected directly"""
+
+    def __init__(self, samples=None, n=3, alpha=0.5):
+        if samples is None:
+            samples = {'en': ENGLISH_SAMPLES, 'hinglish': HINGLISH_SAMPLES}
+        self.n = n
+        self.languages = list(samples)
+        self.log_probs = {}
+        self.unseen = {}
+
+        counts = {language: Counter() for language in self.languages}
+        for language, texts in samples.items():
+            for text in texts:
+                counts[language].update(ngrams(clean(text), n))
+
+        vocabulary = set().union(*counts.values())
+        for language in self.languages:
+            total = sum(counts[language].values()) + alpha * (len(vocabulary) + 1)
+            self.log_probs[language] = {
+                gram: math.log((count + alpha) / total) for gram, count in counts[language].items()
+            }
+            self.unseen[language] = math.log(alpha / total)
+
+    def detect(self, text):
+        """Return 'hi' for Devanagari, 'other' for any other non-Latin script,
+        otherwise the most likely romanized language"""
+        text = str(text)
+        if DEVANAGARI.search(text):
+            return 'hi'
+        # Tamil, Bengali, Urdu, ... have no ASCII n-grams to score; they need translation
+        if has_non_latin_letters(text):
+            return 'other'
+
+        grams = ngrams(clean(text), self.n)
+        if not grams:
+            return 'en'
+
+        best_language, best_score = None, -math.inf
+        for language in self.languages:
+            log_probs, unseen = self.log_probs[language], self.unseen[language]
+            score = sum(log_probs.get(gram, unseen) for gram in grams)
+            if score > best_score:
+                best_language, best_score = language, score
+        return best_language
+
+
+def normalize_hinglish(text):
+    """Map common Hinglish words to English so the intent classifier can use them"""
+    words = clean(text).split()
+    return ' '.join(HINGLISH_TO_ENGLISH.get(word, word) for word in words)
@@ -0,0 +1,181 @@
+# Production debugging tools for SkillHigh Chatbot API
+# Runtime-toggled sampling profiler and slow-request capture in a bounded ring buffer
+
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime
+
+
+def format_stack(frame, limit=30):
+    """Render a frame's call stack as a list of 'file:line function' strings, outermost first"""
+    return [
+        f"{os.path.basename(entry.filename)}:{entry.lineno} {entry.name}"
+        for entry in traceback.extract_stack(frame, limit=limit)
+    ]
+
+
+class SamplingProfiler:
+    """Statistical profiler sampling every thread's stack from a background thread"""
+
+    def __init__(self, interval=0.01, max_stacks=5000):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start sampling; does nothing if already running"""
+        if self.running:
+            return
+        self._stop.clear()
+        self.started_at = datetime.now().isoformat()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and keep the collected stacks"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = None
+
+    def toggle(self):
+        """Start if stopped, stop if running"""
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def reset(self):
+        """Discard collected samples"""
+        with self.lock:
+            self.stacks.clear()
+            self.samples = 0
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self.lock:
+                for thread_id, frame in frames.items():
+                    if thread_id == own_id:
+                        continue
+                    key = ";".join(format_stack(frame))
+                    # Once full, only stacks already seen keep counting
+                    if key in self.stacks or len(self.stacks) < self.max_stacks:
+                        self.stacks[key] += 1
+                self.samples += 1
+
+    def report(self, top=20):
+        """Most frequently sampled stacks"""
+        with self.lock:
+            return {
+                'running': self.running,
+                'started_at': self.started_at,
+                'interval_ms': self.interval * 1000,
+                'samples': self.samples,
+                'top_stacks': [
+                    {'count': count, 'stack': stack.split(";")}
+                    for stack, count in self.stacks.most_common(top)
+                ]
+            }
+
+
+class SlowRequestRecorder:
+    """Captures stage timings and a stack sample for requests slower than a threshold"""
+
+    def __init__(self, threshold_ms=1000, capacity=100, check_interval=None):
+        self.threshold_ms = threshold_ms
+        self.records = deque(maxlen=capacity)
+        self.active = {}
+        self.lock = threading.Lock()
+        self.check_interval = check_interval
+        self._watchdog = threading.Thread(target=self._watch, name="slow-request-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def _watch(self):
+        """Take one stack sample of every request still running past the threshold"""
+        while True:
+            # Check twice per threshold period unless an explicit interval is set
+            time.sleep(self.check_interval or max(self.threshold_ms / 2000.0, 0.01))
+            now = time.perf_counter()
+            with self.lock:
+                overdue = [
+                    (thread_id, state) for thread_id, state in self.active.items()
+                    if state['stack'] is None and (now - state['start']) * 1000 >= self.threshold_ms
+                ]
+            if not overdue:
+                continue
+            frames = sys._current_frames()
+            for thread_id, state in overdue:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    state['stack'] = format_stack(frame)
+
+    @contextmanager
+    def track(self, endpoint):
+        """Track one request; yields a dict the handler fills with stages, details and errors"""
+        thread_id = threading.get_ident()
+        state = {'start': time.perf_counter(), 'stack': None, 'stages': {}, 'details': {}, 'error': None}
+        with self.lock:
+            self.active[thread_id] = state
+        try:
+            yield state
+        except Exception as e:
+            state['error'] = repr(e)
+            raise
+        finally:
+            with self.lock:
+                self.active.pop(thread_id, None)
+            duration_ms = (time.perf_counter() - state['start']) * 1000
+            if duration_ms >= self.threshold_ms or state['error']:
+                self.records.append({
+                    'endpoint': endpoint,
+                    'timestamp': datetime.now().isoformat(),
+                    'duration_ms': round(duration_ms, 2),
+                    'stages_ms': {stage: round(ms, 2) for stage, ms in state['stages'].items()},
+                    'error': state['error'],
+                    'stack_sample': state['stack'],
+                    **state['details']
+                })
+
+    def recent(self, limit=None):
+        """Captured slow or failed requests, newest first"""
+        records = list(self.records)[::-1]
+        return records[:limit] if limit else records
+
+
+@contextmanager
+def stage(timings, name):
+    """Record the duration of one processing stage in milliseconds"""
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def install_signal_toggle(profiler, signal_name='SIGUSR2'):
+    """Toggle the profiler with a POSIX signal when running in the main thread"""
+    signum = getattr(signal, signal_name, None)
+    if signum is None or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(signum, lambda *_: profiler.toggle())
+    return True
@@ -0,0 +1,189 @@
+# Admission control for the SkillHigh Chatbot API
+# Token-bucket rate limiting per client and queue-depth based load shedding
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+
+class ShardedMemoryStore:
+    """In-process token-bucket store split into independently locked shards"""
+
+    def __init__(self, shards=16, max_keys_per_shard=10000):
+        self.shards = [({}, threading.Lock()) for _ in range(shards)]
+        self.max_keys_per_shard = max_keys_per_shard
+
+    def _shard(self, key):
+        return self.shards[zlib.crc32(key.encode('utf-8')) % len(self.shards)]
+
+    def take(self, key, rate, capacity, now):
+        """Take one token from the key's bucket; return (allowed, seconds until next token)"""
+        buckets, lock = self._shard(key)
+        with lock:
+            tokens, updated = buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            buckets[key] = (tokens, now)
+
+            # Buckets that have refilled carry no state and can be dropped
+            if len(buckets) > self.max_keys_per_shard:
+                for idle_key in [k for k, (t, u) in buckets.items() if t + (now - u) * rate >= capacity]:
+                    del buckets[idle_key]
+
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+
+class SQLiteStore:
+    """Token-bucket store in a local SQLite file, shared by all workers on a node"""
+
+    def __init__(self, path, prune_interval=60.0):
+        self.path = path
+        self.prune_interval = prune_interval
+        self.last_prune = 0.0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = None
+        self.pid = None
+        with self.lock:
+            self._connect().execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)"
+            )
+
+    def _connect(self):
+        """Connection owned by this process; a connection inherited across fork is never reused"""
+        if self.connection is None or self.pid != os.getpid():
+            self.connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.pid = os.getpid()
+        return self.connection
+
+    def take(self, key, rate, capacity, now):
+        """Take one token from the key's bucket; return (allowed, seconds until next token)"""
+        with self.lock:
+            cursor = self._connect().cursor()
+            # BEGIN IMMEDIATE serialises the read-modify-write across processes
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                row = cursor.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens, updated = row if row else (capacity, now)
+                tokens = min(capacity, tokens + (now - updated) * rate)
+                allowed = tokens >= 1
+                if allowed:
+                    tokens -= 1
+                cursor.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                    (key, tokens, now)
+                )
+
+                # Buckets that have refilled carry no state and can be dropped
+                if now - self.last_prune >= self.prune_interval:
+                    cursor.execute(
+                        "DELETE FROM buckets WHERE tokens + (? - updated) * ? >= ?",
+                        (now, rate, capacity)
+                    )
+                    self.last_prune = now
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+
+class RateLimiter:
+    """Token-bucket rate limiter keyed by client"""
+
+    def __init__(self, store, requests_per_minute=60, burst=20):
+        self.store = store
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst
+
+    def allow(self, key):
+        """Return (allowed, retry_after_seconds) for one request from key"""
+        return self.store.take(key, self.rate, self.capacity, time.time())
+
+
+class LoadShedder:
+    """Sheds load when too many requests are in flight or latency misses the SLO"""
+
+    def __init__(self, max_in_flight=32, latency_slo_ms=2000, probe_interval=1.0, smoothing=0.2):
+        self.max_in_flight = max_in_flight
+        self.latency_slo_ms = latency_slo_ms
+        self.probe_interval = probe_interval
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.latency_ms = 0.0
+        self.last_probe = 0.0
+        self.shed_count = 0
+        self.lock = threading.Lock()
+
+    def should_shed(self):
+        """Decide whether the next request should get the degraded response"""
+        with self.lock:
+            now = time.monotonic()
+            if self.in_flight >= self.max_in_flight:
+                shed = True
+            elif self.latency_ms > self.latency_slo_ms:
+                # Let one full request through per probe interval to re-measure latency
+                shed = now - self.last_probe < self.probe_interval
+                if not shed:
+                    self.last_probe = now
+            else:
+                shed = False
+
+            if shed:
+                self.shed_count += 1
+            return shed
+
+    @contextmanager
+    def track(self):
+        """Count a full-path request as in flight and record its latency"""
+        with self.lock:
+            self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self.lock:
+                self.in_flight -= 1
+                self.latency_ms += self.smoothing * (elapsed_ms - self.latency_ms)
+
+    def stats(self):
+        """Current shedder state"""
+        with self.lock:
+            return {
+                'in_flight': self.in_flight,
+                'latency_ewma_ms': round(self.latency_ms, 2),
+                'latency_slo_ms': self.latency_slo_ms,
+                'shed_count': self.shed_count
+            }
+
+
+def create_rate_limiter():
+    """Build the rate limiter from environment settings"""
+    if os.environ.get('RATE_LIMIT_BACKEND', 'memory') == 'sqlite':
+        store = SQLiteStore(os.environ.get('RATE_LIMIT_DB', 'logs/rate_limit.db'))
+    else:
+        store = ShardedMemoryStore()
+
+    return RateLimiter(
+        store,
+        requests_per_minute=float(os.environ.get('RATE_LIMIT_PER_MINUTE', 60)),
+        burst=float(os.environ.get('RATE_LIMIT_BURST', 20))
+    )
+
+
+def create_load_shedder():
+    """Build the load shedder from environment settings"""
+    return LoadShedder(
+        max_in_flight=int(os.environ.get('LOAD_SHED_MAX_IN_FLIGHT', 32)),
+        latency_slo_ms=float(os.environ.get('LOAD_SHED_LATENCY_SLO_MS', 2000))
+    )
@@ -0,0 +1,139 @@
+# Precompiled response bundles for SkillHigh Chatbot
+# Every (intent x sentiment prefix x language) variant is rendered once and served by index
+
+import os
+import sys
+import pandas as pd
+
+FALLBACK_RESPONSE = "I'm sorry, I didn't understand that. Could you please rephrase?"
+
+# Prefixes added to responses for negative-sentiment messages
+EMPATHY_PREFIXES = (
+    "I understand your concern. ",
+    "I'm here to help with that. ",
+    "Let me clarify that for you. "
+)
+
+# Intent value used for empathy prefix rows in a bundle file
+PREFIX_INTENT = "EmpathyPrefix"
+
+BUNDLE_FILENAME = "response_bundle.csv"
+
+# Languages served without a bundle file (Hindi via machine translation)
+SUPPORTED_LANGUAGES = ('en', 'hi')
+
+
+class ResponseBundle:
+    """Indexed table of pre-rendered responses per language, intent and prefix"""
+
+    def __init__(self, responses, prefixes=EMPATHY_PREFIXES, fallback=FALLBACK_RESPONSE, translate=None):
+        # The fallback response lives in the last row of every language table
+        self.intents = list(responses)
+        self.index = {intent: i for i, intent in enumerate(self.intents)}
+        self.fallback_index = len(self.intents)
+        self.prefix_count = len(prefixes)
+        self.translate = translate
+
+        # Source components per language; None marks text still to be translated
+        self.components = {}
+        self.tables = {}
+        self.languages = set(SUPPORTED_LANGUAGES)
+        self.add_language('en', {**responses, None: fallback}, list(prefixes))
+
+    def add_language(self, language, responses, prefixes=None):
+        """Register components for a language and pre-render every available variant"""
+        texts = [responses.get(intent) for intent in self.intents] + [responses.get(None)]
+        prefixes = list(prefixes or [])
+        prefixes += [None] * (self.prefix_count - len(prefixes))
+
+        self.languages.add(language)
+        self.components[language] = {'responses': texts, 'prefixes': [''] + prefixes[:self.prefix_count]}
+        self.tables[language] = [[None] * (self.prefix_count + 1) for _ in texts]
+        for row in range(len(texts)):
+            for prefix_index in range(self.prefix_count + 1):
+                self._compose(language, row, prefix_index)
+
+    def _component(self, language, kind, position):
+        """Return one response or prefix in a language, translating it once if needed"""
+        parts = self.components[language][kind]
+        if parts[position] is None and self.translate is not None:
+            source = self.components['en'][kind][position]
+            translated = self.translate(source.strip(), language)
+            # A failed translation returns the source text; keep retrying later instead of caching it
+            if translated and translated != source.strip():
+                parts[position] = sys.intern(translated + (' ' if source.endswith(' ') else ''))
+        return parts[position]
+
+    def _compose(self, language, row, prefix_index):
+        """Render one variant into the table if all of its components are available"""
+        response = self.components[language]['responses'][row]
+        prefix = self.components[language]['prefixes'][prefix_index]
+        if response is not None and prefix is not None:
+            self.tables[language][row][prefix_index] = sys.intern(prefix + response)
+
+    def intent_row(self, intent):
+        """Table row for an intent, or the fallback row"""
+        return self.index.get(intent, self.fallback_index)
+
+    def render(self, intent, prefix_index=0, language='en'):
+        """Look up a rendered response; missing translations are filled once on first use"""
+        if language not in self.languages:
+            # Never create tables for arbitrary client-supplied codes
+            language = 'en'
+        if language not in self.tables:
+            self.add_language(language, {})
+
+        row = self.intent_row(intent)
+        rendered = self.tables[language][row][prefix_index]
+        if rendered is not None:
+            return rendered
+
+        response = self._component(language, 'responses', row)
+        prefix = self._component(language, 'prefixes', prefix_index)
+        if response is None or prefix is None:
+            # Translation unavailable: serve the English variant without caching it
+            return self.tables['en'][row][prefix_index]
+
+        self._compose(language, row, prefix_index)
+        return self.tables[language][row][prefix_index]
+
+    def compile_language(self, language):
+        """Render every variant of a language up front"""
+        for row in range(len(self.intents) + 1):
+            for prefix_index in range(self.prefix_count + 1):
+                self.render(self.intents[row] if row < len(self.intents) else None, prefix_index, language)
+
+    def coverage(self):
+        """Number of pre-rendered variants per language"""
+        return {
+            language: sum(text is not None for row in table for text in row)
+            for language, table in self.tables.items()
+        }
+
+
+def load_bundle_file(path):
+    """Load hand-written response bundles from a Language,Intent,Response CSV file"""
+    bundles = {}
+    if not os.path.exists(path):
+        return bundles
+
+    df = pd.read_csv(path).dropna()
+    for _, row in df.iterrows():
+        language = str(row['Language']).strip()
+        intent = str(row['Intent']).strip()
+        bundle = bundles.setdefault(language, {'responses': {}, 'prefixes': []})
+        if intent == PREFIX_INTENT:
+            bundle['prefixes'].append(str(row['Response']).rstrip() + ' ')
+        else:
+            bundle['responses'][intent] = str(row['Response'])
+    return bundles
+
+
+def build_response_bundle(responses, data_path, translate=None):
+    """Compile the response bundle at train time, including bundle files next to data_path"""
+    bundle = ResponseBundle(responses, translate=translate)
+    bundle_path = os.path.join(os.path.dirname(data_path), BUNDLE_FILENAME)
+    for language, components in load_bundle_file(bundle_path).items():
+        if language != 'en':
+            bundle.add_language(language, components['responses'], components['prefixes'])
+    return bundle
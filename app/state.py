@@ -0,0 +1,248 @@
+# Session and analytics state for SkillHigh Chatbot
+# In-process store, or a private SQLite file that every worker on a node reads and writes
+
+import json
+import os
+import sqlite3
+import stat
+import threading
+
+
+def new_analytics():
+    """Empty analytics payload in the shape served by /analytics"""
+    return {
+        'total_conversations': 0,
+        'intent_counts': {},
+        'sentiment_counts': {'positive': 0, 'negative': 0, 'neutral': 0},
+        'language_usage': {'en': 0, 'hi': 0},
+        'daily_stats': {}
+    }
+
+
+def check_private_path(path):
+    """Refuse a state file another user could have created or can write to"""
+    if not hasattr(os, 'getuid'):
+        return
+    directory = os.path.dirname(os.path.abspath(path))
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"State directory {directory} must be owned by this user and not group/world writable")
+    for candidate in (path, path + '-wal', path + '-shm'):
+        if os.path.lexists(candidate):
+            info = os.lstat(candidate)
+            if not stat.S_ISREG(info.st_mode) or info.st_uid != os.getuid():
+                raise PermissionError(f"State file {candidate} is not a regular file owned by this user")
+
+
+class MemoryStateStore:
+    """Per-process session and analytics state (single worker deployments)"""
+
+    def __init__(self, max_turns=5):
+        self.max_turns = max_turns
+        self.sessions = {}
+        self.versions = {}
+        self.version_counter = 0
+        self.analytics_data = new_analytics()
+        self.lock = threading.Lock()
+
+    def _bump(self, key):
+        self.version_counter += 1
+        self.versions[key] = self.version_counter
+
+    def get_session(self, user_id):
+        """Recent turns of a user, oldest first"""
+        with self.lock:
+            return list(self.sessions.get(user_id, []))
+
+    def append_turn(self, user_id, turn):
+        """Add a turn to a user's session, keeping only the last max_turns"""
+        with self.lock:
+            turns = self.sessions.get(user_id, []) + [turn]
+            self.sessions[user_id] = turns[-self.max_turns:]
+            self._bump(('session', user_id))
+
+    def clear_session(self, user_id):
+        """Remove a user's session; returns whether there was one"""
+        with self.lock:
+            if self.sessions.pop(user_id, None) is None:
+                return False
+            self._bump(('session', user_id))
+            return True
+
+    def session_version(self, user_id):
+        """Version of a user's session data (0 if never written)"""
+        with self.lock:
+            return self.versions.get(('session', user_id), 0)
+
+    def record_conversation(self, intent, sentiment, language, day):
+        """Count one answered message in the analytics"""
+        with self.lock:
+            data = self.analytics_data
+            data['total_conversations'] += 1
+            data['intent_counts'][intent] = data['intent_counts'].get(intent, 0) + 1
+            data['sentiment_counts'][sentiment] = data['sentiment_counts'].get(sentiment, 0) + 1
+            data['language_usage'][language] = data['language_usage'].get(language, 0) + 1
+            data['daily_stats'][day] = data['daily_stats'].get(day, 0) + 1
+            self._bump('analytics')
+
+    def analytics(self):
+        """Copy of the analytics payload"""
+        with self.lock:
+            return {key: dict(value) if isinstance(value, dict) else value
+                    for key, value in self.analytics_data.items()}
+
+    def analytics_version(self):
+        """Version of the analytics data (0 if never written)"""
+        with self.lock:
+            return self.versions.get('analytics', 0)
+
+
+class SQLiteStateStore:
+    """Session and analytics state in a local SQLite file shared by all workers on a node
+
+    The default location is a private directory on tmpfs (/dev/shm) so reads and writes
+    never touch disk. Versions come from one counter in the file, so they stay monotonic
+    across workers.
+    """
+
+    # Analytics rows are (kind, key) counters; the payload is rebuilt from them on read
+    ANALYTICS_KINDS = {
+        'intent': 'intent_counts',
+        'sentiment': 'sentiment_counts',
+        'language': 'language_usage',
+        'day': 'daily_stats'
+    }
+
+    def __init__(self, path, max_turns=5):
+        self.path = path
+        self.max_turns = max_turns
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        check_private_path(path)
+        self.lock = threading.Lock()
+        self.connection = None
+        self.pid = None
+        with self.lock:
+            self._connect().executescript("""
+                CREATE TABLE IF NOT EXISTS sessions (user_id TEXT PRIMARY KEY, turns TEXT, version INTEGER);
+                CREATE TABLE IF NOT EXISTS analytics (kind TEXT, key TEXT, count INTEGER, PRIMARY KEY (kind, key));
+                CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, value INTEGER);
+            """)
+
+    def _connect(self):
+        """Connection owned by this process; a connection inherited across fork is never reused"""
+        if self.connection is None or self.pid != os.getpid():
+            self.connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.pid = os.getpid()
+        return self.connection
+
+    def _write(self, statements):
+        """Run statements(cursor) in one immediate transaction and return its result"""
+        with self.lock:
+            cursor = self._connect().cursor()
+            # BEGIN IMMEDIATE serialises writers across processes
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(cursor)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+        return result
+
+    @staticmethod
+    def _next_version(cursor, name):
+        """Take the next value of the shared version counter, optionally recording it under name"""
+        cursor.execute(
+            "INSERT INTO versions (name, value) VALUES ('counter', 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1"
+        )
+        version = cursor.execute("SELECT value FROM versions WHERE name = 'counter'").fetchone()[0]
+        if name is not None:
+            cursor.execute("INSERT OR REPLACE INTO versions (name, value) VALUES (?, ?)", (name, version))
+        return version
+
+    def _read(self, query, params):
+        """Run a read-only query"""
+        with self.lock:
+            return self._connect().execute(query, params).fetchall()
+
+    def get_session(self, user_id):
+        """Recent turns of a user, oldest first"""
+        rows = self._read("SELECT turns FROM sessions WHERE user_id = ?", (user_id,))
+        return json.loads(rows[0][0]) if rows and rows[0][0] is not None else []
+
+    def append_turn(self, user_id, turn):
+        """Add a turn to a user's session, keeping only the last max_turns"""
+        def statements(cursor):
+            row = cursor.execute("SELECT turns FROM sessions WHERE user_id = ?", (user_id,)).fetchone()
+            turns = json.loads(row[0]) if row and row[0] is not None else []
+            turns = (turns + [turn])[-self.max_turns:]
+            cursor.execute(
+                "INSERT OR REPLACE INTO sessions (user_id, turns, version) VALUES (?, ?, ?)",
+                (user_id, json.dumps(turns), self._next_version(cursor, None))
+            )
+        self._write(statements)
+
+    def clear_session(self, user_id):
+        """Remove a user's session; returns whether there was one"""
+        def statements(cursor):
+            row = cursor.execute("SELECT turns FROM sessions WHERE user_id = ?", (user_id,)).fetchone()
+            if row is None or row[0] is None:
+                return False
+            # Keep the row with a new version so cached snapshots of the old session go stale
+            cursor.execute(
+                "UPDATE sessions SET turns = NULL, version = ? WHERE user_id = ?",
+                (self._next_version(cursor, None), user_id)
+            )
+            return True
+        return self._write(statements)
+
+    def session_version(self, user_id):
+        """Version of a user's session data (0 if never written)"""
+        rows = self._read("SELECT version FROM sessions WHERE user_id = ?", (user_id,))
+        return rows[0][0] if rows else 0
+
+    def record_conversation(self, intent, sentiment, language, day):
+        """Count one answered message in the analytics"""
+        def statements(cursor):
+            cursor.executemany(
+                "INSERT INTO analytics (kind, key, count) VALUES (?, ?, 1) "
+                "ON CONFLICT(kind, key) DO UPDATE SET count = count + 1",
+                [('total', ''), ('intent', intent), ('sentiment', sentiment),
+                 ('language', language), ('day', day)]
+            )
+            self._next_version(cursor, 'analytics')
+        self._write(statements)
+
+    def analytics(self):
+        """Analytics payload aggregated from the shared counters"""
+        data = new_analytics()
+        for kind, key, count in self._read("SELECT kind, key, count FROM analytics", ()):
+            if kind == 'total':
+                data['total_conversations'] = count
+            elif kind in self.ANALYTICS_KINDS:
+                data[self.ANALYTICS_KINDS[kind]][key] = count
+        return data
+
+    def analytics_version(self):
+        """Version of the analytics data (0 if never written)"""
+        rows = self._read("SELECT value FROM versions WHERE name = 'analytics'", ())
+        return rows[0][0] if rows else 0
+
+
+def default_state_path():
+    """Per-user private directory in shared memory, falling back to the logs directory"""
+    if os.path.isdir('/dev/shm') and hasattr(os, 'getuid'):
+        return os.path.join('/dev/shm', f'skillhigh-{os.getuid()}', 'state.db')
+    return 'logs/state.db'
+
+
+def create_state_store():
+    """Build the session and analytics store from environment settings"""
+    if os.environ.get('STATE_BACKEND', 'memory') == 'sqlite':
+        return SQLiteStateStore(os.environ.get('STATE_DB', default_state_path()))
+    return MemoryStateStore()
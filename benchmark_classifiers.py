@@ -0,0 +1,89 @@
+# Benchmark intent classifier backends for SkillHigh Chatbot
+# Compares the TF-IDF + Naive Bayes classifier with the embedding backend on paraphrases
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from app.chatbot import SkillHighChatbot
+
+DATA_PATH = "data/intents.csv"
+
+# Paraphrases that share little vocabulary with the training rows
+PARAPHRASES = [
+    ("How much money do I need to pay?", "AskFees"),
+    ("Is there any scholarship or EMI option?", "AskFees"),
+    ("Which programs can I study with you?", "AskCourses"),
+    ("Do you teach machine learning?", "AskCourses"),
+    ("Can I work at a company while studying?", "AskInternship"),
+    ("Will I receive a document after finishing?", "AskCertification"),
+    ("Do you help students get hired?", "AskPlacement"),
+    ("How many weeks does it take to finish?", "AskDuration"),
+    ("Can I attend from home?", "AskMode"),
+    ("How do I sign up?", "AskEnrollment"),
+    ("Do I need to know coding before joining?", "AskPrerequisites"),
+    ("Who are you guys?", "AskAbout"),
+    ("What kind of questions can you answer?", "AskCapabilities"),
+    ("I'm lost and need some guidance", "AskHelp"),
+    ("Can I have my money back?", "AskRefund"),
+    ("That was really useful, appreciate it", "Gratitude"),
+    ("See you later", "Goodbye"),
+    ("Good evening!", "Greeting"),
+]
+
+def benchmark(backend):
+    """Train one backend and measure accuracy and per-message latency"""
+    os.environ['INTENT_BACKEND'] = backend
+    chatbot = SkillHighChatbot()
+
+    start = time.perf_counter()
+    if not chatbot.train_model(DATA_PATH):
+        return None
+    train_ms = (time.perf_counter() - start) * 1000
+
+    if backend == 'embedding' and chatbot.embedding_classifier is None:
+        return None
+
+    # Warm up once so the first-call cost is not counted
+    chatbot.predict_intent("hello")
+
+    latencies = []
+    correct = 0
+    for text, expected in PARAPHRASES:
+        start = time.perf_counter()
+        intent, _ = chatbot.predict_intent(text)
+        latencies.append((time.perf_counter() - start) * 1000)
+        correct += intent == expected
+
+    start = time.perf_counter()
+    chatbot.predict_intent_batch([text for text, _ in PARAPHRASES])
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        'accuracy': correct / len(PARAPHRASES),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'batch_ms': batch_ms,
+        'train_ms': train_ms
+    }
+
+def main():
+    """Run the benchmark for every available backend"""
+    print("📊 Intent classifier benchmark")
+    print(f"{len(PARAPHRASES)} paraphrased queries")
+    print("=" * 72)
+    print(f"{'Backend':<12}{'Accuracy':>10}{'p50 ms':>10}{'p95 ms':>10}{'Batch ms':>12}{'Train ms':>12}")
+    print("-" * 72)
+
+    for backend in ['tfidf', 'embedding']:
+        result = benchmark(backend)
+        if result is None:
+            print(f"{backend:<12}  not available (set EMBEDDING_MODEL_PATH to a local sentence-transformers model)")
+            continue
+        print(f"{backend:<12}{result['accuracy']:>10.0%}{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}"
+              f"{result['batch_ms']:>12.3f}{result['train_ms']:>12.1f}")
+
+if __name__ == "__main__":
+    main()
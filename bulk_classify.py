@@ -0,0 +1,199 @@
+# Bulk intent classification for exported chat transcripts
+# Streams JSONL/CSV input through the classifier in chunks with bounded memory
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import csv
+import json
+from collections import deque
+from multiprocessing import Pool
+
+from app.chatbot import SkillHighChatbot
+
+# Model used inside each worker process
+worker_chatbot = None
+
+def detect_format(path, fmt=None):
+    """Return 'jsonl' or 'csv' from an explicit format or the file extension"""
+    if fmt:
+        return fmt
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+def read_records(path, fmt):
+    """Yield input records one at a time"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def chunked(records, size):
+    """Group a record stream into lists of at most size records"""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def load_chatbot(data_path):
+    """Train a side-effect free chatbot instance for classification"""
+    chatbot = SkillHighChatbot()
+    if not chatbot.train_model(data_path):
+        raise RuntimeError(f"Could not train model from {data_path}")
+    return chatbot
+
+def init_worker(data_path):
+    """Train the model once per worker process"""
+    global worker_chatbot
+    worker_chatbot = load_chatbot(data_path)
+
+def classify_chunk(chatbot, chunk, text_field, with_sentiment):
+    """Classify one chunk of records without touching sessions, analytics or translation"""
+    texts = [str(record.get(text_field) or '') for record in chunk]
+    predictions = chatbot.predict_intent_batch(texts)
+
+    results = []
+    for record, text, (intent, confidence) in zip(chunk, texts, predictions):
+        result = dict(record)
+        result['intent'] = intent
+        result['confidence'] = round(confidence, 4)
+        if with_sentiment:
+            result['sentiment'] = chatbot.analyze_sentiment(text)
+        results.append(result)
+    return results
+
+def classify_in_worker(chunk, text_field, with_sentiment):
+    """Pool entry point for classify_chunk"""
+    return classify_chunk(worker_chatbot, chunk, text_field, with_sentiment)
+
+class ResultWriter:
+    """Append results to JSONL or CSV output, flushing after every chunk"""
+
+    def __init__(self, path, fmt, append):
+        self.fmt = fmt
+        self.append = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self.file = open(path, 'a' if append else 'w', newline='', encoding='utf-8')
+        self.csv_writer = None
+
+    def write(self, results):
+        for result in results:
+            if self.fmt == 'csv':
+                if self.csv_writer is None:
+                    self.csv_writer = csv.DictWriter(self.file, fieldnames=list(result), extrasaction='ignore')
+                    if not self.append:
+                        self.csv_writer.writeheader()
+                self.csv_writer.writerow(result)
+            else:
+                self.file.write(json.dumps(result, ensure_ascii=False) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    @property
+    def offset(self):
+        """Bytes written to the output file so far"""
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+def read_progress(progress_path):
+    """(records done, output bytes) committed by a previous run; bytes is None for old progress files"""
+    if not os.path.exists(progress_path):
+        return 0, 0
+    with open(progress_path) as f:
+        progress = json.load(f)
+    return progress.get('records_done', 0), progress.get('output_bytes')
+
+def write_progress(progress_path, records_done, output_bytes):
+    """Atomically record how many input records and output bytes have been written"""
+    temp_path = progress_path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump({'records_done': records_done, 'output_bytes': output_bytes}, f)
+    os.replace(temp_path, progress_path)
+
+def truncate_output(path, output_bytes):
+    """Drop output written after the last committed progress (a chunk whose progress was never saved)"""
+    if output_bytes is not None and os.path.exists(path) and os.path.getsize(path) > output_bytes:
+        with open(path, 'r+b') as f:
+            f.truncate(output_bytes)
+
+def skip(records, count):
+    """Skip the first count records of a stream"""
+    for index, record in enumerate(records):
+        if index >= count:
+            yield record
+
+def classify_stream(chunks, args):
+    """Yield classified chunks in input order, in-process or across worker processes"""
+    if args.workers <= 1:
+        chatbot = load_chatbot(args.data)
+        for chunk in chunks:
+            yield classify_chunk(chatbot, chunk, args.text_field, args.sentiment)
+        return
+
+    # Keep a bounded window of chunks in flight so memory does not grow with the file
+    with Pool(args.workers, initializer=init_worker, initargs=(args.data,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(classify_in_worker, (chunk, args.text_field, args.sentiment)))
+            if len(pending) >= args.workers * 2:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+def run(args):
+    """Classify the input file into the output file"""
+    input_format = detect_format(args.input, args.input_format)
+    output_format = detect_format(args.output, args.output_format)
+    progress_path = args.output + '.progress'
+
+    records_done, output_bytes = read_progress(progress_path) if args.resume else (0, 0)
+    if records_done:
+        print(f"Resuming after {records_done} records")
+        truncate_output(args.output, output_bytes)
+
+    records = skip(read_records(args.input, input_format), records_done)
+    writer = ResultWriter(args.output, output_format, append=records_done > 0)
+    try:
+        for results in classify_stream(chunked(records, args.chunk_size), args):
+            writer.write(results)
+            records_done += len(results)
+            write_progress(progress_path, records_done, writer.offset)
+            print(f"\r📄 {records_done} records classified", end="", flush=True)
+    finally:
+        writer.close()
+
+    print()
+    print(f"✅ Done: {records_done} records written to {args.output}")
+    return records_done
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Classify chat transcripts in bulk")
+    parser.add_argument("input", help="Input file (.jsonl or .csv)")
+    parser.add_argument("output", help="Output file (.jsonl or .csv)")
+    parser.add_argument("--text-field", default="message", help="Field holding the message text")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"], help="Override input format detection")
+    parser.add_argument("--output-format", choices=["jsonl", "csv"], help="Override output format detection")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Records classified per batch")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument("--sentiment", action="store_true", help="Also add TextBlob sentiment")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run")
+    parser.add_argument("--data", default="data/intents.csv", help="Training data path")
+    return parser.parse_args(argv)
+
+def main():
+    """Command line entry point"""
+    print("🤖 SkillHigh Bulk Intent Classifier")
+    print("=" * 50)
+    run(parse_args())
+
+if __name__ == "__main__":
+    main()
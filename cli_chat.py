@@ -4,7 +4,33 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app.chatbot import initialize_chatbot, get_chatbot
+from app.client import ChatClient, DEFAULT_API_URL
+
+def get_option(name, default=None):
+    """Read a --name value option from the command line"""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+def connect(user_id):
+    """Return a send(message) function backed by the shared API, or a local model as fallback"""
+    if '--local' not in sys.argv:
+        client = ChatClient(get_option('--api-url', DEFAULT_API_URL))
+        if client.is_available():
+            print(f"✅ Connected to API at {client.api_url}")
+            return lambda message: client.chat(message, user_id)
+        client.close()
+        print(f"⚠️ API not reachable at {client.api_url}, starting a local model instead")
+    
+    # Local mode trains its own in-process model
+    from app.chatbot import initialize_chatbot, get_chatbot
+    print("Initializing chatbot...")
+    if not initialize_chatbot():
+        return None
+    chatbot = get_chatbot()
+    return lambda message: chatbot.get_response(message, user_id)
 
 def main():
     """Command line chat interface"""
@@ -14,21 +40,17 @@ def main():
     print("Type 'help' for available commands")
     print("=" * 50)
     
-    # Initialize chatbot
-    print("Initializing chatbot...")
-    success = initialize_chatbot()
+    # Connect to the API (or fall back to a local model)
+    user_id = "cli_user"
+    send = connect(user_id)
     
-    if not success:
+    if send is None:
         print("❌ Failed to initialize chatbot. Please check your setup.")
         return
     
     print("✅ Chatbot ready!")
     print()
     
-    # Get chatbot instance
-    chatbot = get_chatbot()
-    user_id = "cli_user"
-    
     # Main chat loop
     while True:
         try:
@@ -52,7 +74,7 @@ def main():
             
             # Get chatbot response
             print("🤖 SkillHigh Assistant: ", end="", flush=True)
-            result = chatbot.get_response(user_input, user_id)
+            result = send(user_input)
             
             print(result['response'])
             
@@ -74,6 +96,10 @@ def print_help():
     print("  quit     - Exit the chat")
     print("  exit     - Exit the chat")
     print("  bye      - Exit the chat")
+    print("\n⚙️ Options:")
+    print("  --api-url URL  - Chat API to connect to (default: http://localhost:5000)")
+    print("  --local        - Run a local in-process model instead of the API")
+    print("  --debug        - Show intent, confidence and sentiment")
     print("\n💡 Example Questions:")
     print("  - What courses do you offer?")
     print("  - Tell me about internships")
@@ -11,6 +11,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import pandas as pd
+from app.client import ChatClient
 
 # Page configuration
 st.set_page_config(
@@ -76,19 +77,20 @@ if 'user_id' not in st.session_state:
 if 'api_url' not in st.session_state:
     st.session_state.api_url = "http://localhost:5000"
 
+def get_client():
+    """Get the pooled API client for the current API URL"""
+    client = st.session_state.get('api_client')
+    if client is None or client.api_url != st.session_state.api_url.rstrip("/"):
+        if client is not None:
+            client.close()
+        client = ChatClient(st.session_state.api_url)
+        st.session_state.api_client = client
+    return client
+
 def send_message(message, language="en"):
     """Send message to chatbot API"""
     try:
-        response = requests.post(
-            f"{st.session_state.api_url}/chat",
-            json={
-                "message": message,
-                "user_id": st.session_state.user_id,
-                "language": language
-            },
-            timeout=10
-        )
-        return response.json()
+        return get_client().chat(message, st.session_state.user_id, language)
     except requests.exceptions.RequestException as e:
         return {
             "response": "Sorry, I'm having trouble connecting to the server. Please make sure the API is running.",
@@ -100,8 +102,7 @@ def send_message(message, language="en"):
 def get_analytics():
     """Get analytics data from API"""
     try:
-        response = requests.get(f"{st.session_state.api_url}/analytics", timeout=5)
-        return response.json()
+        return get_client().analytics()
     except:
         return None
 
@@ -15,6 +15,8 @@ if __name__ == '__main__':
     print("- POST /chat - Main chat endpoint")
     print("- GET /analytics - Usage analytics")
     print("- GET /health - Health check")
+    print("- GET /live - Liveness probe")
+    print("- GET /ready - Readiness probe")
     print("- GET /session/<user_id> - Get session history")
     print("- DELETE /session/<user_id> - Clear session")
     print("\nAPI will be available at: http://localhost:5000")
@@ -0,0 +1,272 @@
+# Test script for SkillHigh Chatbot API
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.api import app
+
+# Admin endpoints are only enabled with ADMIN_TOKEN set
+ADMIN_TOKEN = "test-admin-token"
+ADMIN_HEADERS = {'X-Admin-Token': ADMIN_TOKEN}
+
+def test_probes():
+    """Test liveness and readiness endpoints"""
+    client = app.test_client()
+    
+    response = client.get('/live')
+    assert response.status_code == 200
+    
+    response = client.get('/ready')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['status'] == 'ready'
+    assert data['warmup']['messages'] > 0
+    assert 'model_training' in data['startup_timings_ms']
+    
+    # Warm-up must not leave a session behind
+    assert client.get('/session/__warmup__').get_json() == []
+
+def test_chat():
+    """Test the chat endpoint"""
+    client = app.test_client()
+    
+    response = client.post('/chat', json={"message": "What courses do you offer?", "user_id": "api_test"})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['response']
+    assert data['intent']
+
+def test_unsupported_language():
+    """Test that unknown language codes are rejected before they reach the bundle or analytics"""
+    from app import api
+    
+    client = app.test_client()
+    response = client.post('/chat', json={"message": "Hello", "user_id": "lang_test", "language": "xx"})
+    assert response.status_code == 400
+    assert 'en' in response.get_json()['supported_languages']
+    assert 'xx' not in api.chatbot.response_bundle.tables
+    assert 'xx' not in client.get('/analytics').get_json()['language_usage']
+
+def test_chat_rejects_bad_input(monkeypatch):
+    """Test that malformed chat requests are client errors, not recorded server failures"""
+    from app import api
+    
+    monkeypatch.setenv('ADMIN_TOKEN', ADMIN_TOKEN)
+    client = app.test_client()
+    before = len(api.slow_requests.records)
+    
+    assert client.post('/chat', data="hello", content_type="text/plain").status_code == 415
+    assert client.post('/chat', data="null", content_type="application/json").status_code == 400
+    assert client.post('/chat', data="{bad", content_type="application/json").status_code == 400
+    assert client.post('/chat', json={"message": 123}).status_code == 400
+    assert client.post('/chat', json={"message": "hi", "user_id": ["a"]}).status_code == 400
+    assert len(api.slow_requests.records) == before
+    
+    assert client.get('/admin/profiler?top=x', headers=ADMIN_HEADERS).status_code == 200
+
+def test_rate_limit():
+    """Test that a client looping on /chat gets HTTP 429"""
+    from app import api
+    
+    client = app.test_client()
+    statuses = [
+        client.post('/chat', json={"message": "Hi", "user_id": "rate_limit_test"}).status_code
+        for _ in range(int(api.rate_limiter.capacity) + 1)
+    ]
+    assert statuses[-1] == 429
+    assert statuses.count(200) == int(api.rate_limiter.capacity)
+
+def test_load_shedding():
+    """Test that an overloaded worker returns the degraded English response"""
+    from app import api
+    
+    client = app.test_client()
+    max_in_flight = api.load_shedder.max_in_flight
+    api.load_shedder.max_in_flight = 0
+    try:
+        response = client.post('/chat', json={"message": "What are the fees?", "user_id": "shed_test", "language": "hi"})
+    finally:
+        api.load_shedder.max_in_flight = max_in_flight
+    
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data['degraded'] is True
+    assert data['response'] == api.chatbot.responses[data['intent']]
+
+def test_sqlite_rate_limit_store(tmp_path):
+    """Test the shared bucket store: limits, pruning of refilled buckets and reconnect after fork"""
+    import os
+    from app.rate_limit import SQLiteStore
+    
+    store = SQLiteStore(str(tmp_path / "buckets.db"), prune_interval=0)
+    assert store.take("user:a", 1.0, 2, 100.0) == (True, 0.0)
+    assert store.take("user:a", 1.0, 2, 100.0) == (True, 0.0)
+    assert store.take("user:a", 1.0, 2, 100.0)[0] is False
+    
+    # user:a has fully refilled 10s later and is pruned on the next write
+    store.take("user:b", 1.0, 2, 110.0)
+    keys = [row[0] for row in store._connect().execute("SELECT key FROM buckets")]
+    assert keys == ["user:b"]
+    
+    # A connection inherited across fork is replaced in the child
+    connection = store.connection
+    store.pid = os.getpid() + 1
+    store.take("user:c", 1.0, 2, 110.0)
+    assert store.connection is not connection
+
+def test_analytics_etag():
+    """Test ETag revalidation and gzip on read endpoints"""
+    client = app.test_client()
+    
+    response = client.get('/analytics')
+    etag = response.headers['ETag']
+    assert response.status_code == 200
+    
+    # Unchanged data revalidates with 304 and no body
+    response = client.get('/analytics', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    
+    # A new conversation changes the snapshot
+    client.post('/chat', json={"message": "Hello", "user_id": "etag_test"})
+    response = client.get('/analytics', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    
+    # Session snapshots follow writes and deletes
+    session_etag = client.get('/session/etag_test').headers['ETag']
+    assert client.get('/session/etag_test', headers={'If-None-Match': session_etag}).status_code == 304
+    client.delete('/session/etag_test')
+    response = client.get('/session/etag_test', headers={'If-None-Match': session_etag})
+    assert response.status_code == 200
+    assert response.get_json() == []
+
+def test_gzip_large_payload():
+    """Test that large snapshots are gzip-compressed when the client accepts it"""
+    import gzip
+    import json
+    from app import api
+    from app.state import MemoryStateStore
+    
+    state_store = api.state_store
+    api.state_store = MemoryStateStore()
+    for i in range(200):
+        api.state_store.record_conversation(f"Intent{i}", 'neutral', 'en', '2024-01-01')
+    try:
+        response = app.test_client().get('/analytics', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(response.data))['intent_counts']['Intent5'] == 1
+        
+        # Each encoding has its own tag, and a 304 varies on Accept-Encoding too
+        gzip_etag = response.headers['ETag']
+        identity = app.test_client().get('/analytics')
+        assert 'Content-Encoding' not in identity.headers
+        assert identity.headers['ETag'] != gzip_etag
+        assert app.test_client().get('/analytics', headers={'If-None-Match': gzip_etag}).status_code == 200
+        response = app.test_client().get('/analytics', headers={'Accept-Encoding': 'gzip', 'If-None-Match': gzip_etag})
+        assert response.status_code == 304
+        assert response.headers['Vary'] == 'Accept-Encoding'
+    finally:
+        api.state_store = state_store
+        api.snapshot_cache.invalidate('analytics')
+
+def test_slow_request_capture(monkeypatch):
+    """Test that slow requests are captured with a stage breakdown"""
+    from app import api
+    
+    monkeypatch.setenv('ADMIN_TOKEN', ADMIN_TOKEN)
+    client = app.test_client()
+    threshold_ms = api.slow_requests.threshold_ms
+    api.slow_requests.threshold_ms = 0
+    try:
+        client.post('/chat', json={"message": "How can I enroll?", "user_id": "slow_test"})
+    finally:
+        api.slow_requests.threshold_ms = threshold_ms
+    
+    record = client.get('/admin/slow-requests?limit=1', headers=ADMIN_HEADERS).get_json()['requests'][0]
+    assert record['endpoint'] == '/chat'
+    assert record['input_chars'] == len("How can I enroll?")
+    assert record['language'] == 'en'
+    assert 'predict_intent' in record['stages_ms']
+
+def test_admin_requires_token(monkeypatch):
+    """Test that admin endpoints are closed without a configured token and never CORS-enabled"""
+    client = app.test_client()
+    
+    monkeypatch.delenv('ADMIN_TOKEN', raising=False)
+    assert client.get('/admin/slow-requests', headers=ADMIN_HEADERS).status_code == 403
+    assert client.post('/admin/profiler', json={"action": "start"}).status_code == 403
+    
+    monkeypatch.setenv('ADMIN_TOKEN', ADMIN_TOKEN)
+    assert client.get('/admin/slow-requests', headers={'X-Admin-Token': "wrong"}).status_code == 403
+    response = client.get('/admin/slow-requests', headers={**ADMIN_HEADERS, 'Origin': "http://example.com"})
+    assert response.status_code == 200
+    assert 'Access-Control-Allow-Origin' not in response.headers
+    assert 'Access-Control-Allow-Origin' in client.get('/health', headers={'Origin': "http://example.com"}).headers
+
+def test_profiler_toggle(monkeypatch):
+    """Test starting and stopping the sampling profiler at runtime"""
+    import time
+    
+    monkeypatch.setenv('ADMIN_TOKEN', ADMIN_TOKEN)
+    client = app.test_client()
+    assert client.post('/admin/profiler', json={"action": "start"}, headers=ADMIN_HEADERS).get_json()['running']
+    time.sleep(0.1)
+    report = client.post('/admin/profiler', json={"action": "stop"}, headers=ADMIN_HEADERS).get_json()
+    assert not report['running']
+    assert report['samples'] > 0
+    assert client.post('/admin/profiler', json={"action": "bogus"}, headers=ADMIN_HEADERS).status_code == 400
+
+def test_model_experiment(tmp_path, monkeypatch):
+    """Test shadow scoring off the response path and sticky A/B serving"""
+    import json
+    from app import api
+    from app.chatbot import SkillHighChatbot
+    from app.experiments import ModelExperiment
+    
+    candidate = SkillHighChatbot()
+    assert candidate.train_model("data/intents.csv")
+    candidate.predict_intent = lambda text, user_id=None: ("AskRefund", 0.9)
+    log_path = tmp_path / "shadow.jsonl"
+    
+    monkeypatch.setenv('ADMIN_TOKEN', ADMIN_TOKEN)
+    client = app.test_client()
+    api.experiment = ModelExperiment(api.chatbot, candidate, sample_rate=1.0, log_path=str(log_path))
+    try:
+        data = client.post('/chat', json={"message": "Hello", "user_id": "shadow_test"}).get_json()
+        assert 'variant' not in data
+        api.experiment.wait()
+        
+        report = client.get('/admin/experiment', headers=ADMIN_HEADERS).get_json()
+        assert report['scored'] == 1
+        assert report['agreement_rate'] == 0.0
+        assert report['top_disagreements'][0]['intents'].endswith("-> AskRefund")
+        record = json.loads(log_path.read_text().splitlines()[0])
+        assert record['candidate']['intent'] == "AskRefund"
+        assert 'latency_delta_ms' in record
+        
+        # Shadow scoring reuses the primary's translated text instead of translating again
+        translations = []
+        translate_text = api.chatbot.translate_text
+        api.chatbot.translate_text = lambda text, target_lang='hi': translations.append(target_lang) or "What are the fees?"
+        try:
+            client.post('/chat', json={"message": "फीस कितनी है", "user_id": "shadow_test", "language": "hi"})
+            api.experiment.wait()
+        finally:
+            api.chatbot.translate_text = translate_text
+        assert translations.count('en') == 1
+        assert json.loads(log_path.read_text().splitlines()[-1])['text'] == "What are the fees?"
+        
+        # Candidate-served users are never shadow-scored and share the primary's session store
+        api.experiment.candidate_split = 1.0
+        data = client.post('/chat', json={"message": "Hello", "user_id": "ab_test"}).get_json()
+        assert data['variant'] == 'candidate'
+        assert data['intent'] == "AskRefund"
+        assert client.get('/session/ab_test').get_json()[-1]['intent'] == "AskRefund"
+        api.experiment.wait()
+        assert api.experiment.stats()['scored'] == 2
+    finally:
+        api.experiment = None
+    
+    assert client.get('/admin/experiment', headers=ADMIN_HEADERS).get_json() == {"enabled": False}
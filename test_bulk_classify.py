@@ -0,0 +1,39 @@
+# Test script for bulk transcript classification
+
+import sys
+import os
+import json
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bulk_classify import parse_args, run
+
+def test_bulk_classify_resume(tmp_path):
+    """Test streaming classification and resuming an interrupted run"""
+    input_path = tmp_path / "transcripts.jsonl"
+    output_path = tmp_path / "labels.jsonl"
+    messages = ["Hi", "What are the course fees?", "Can I get a refund?", "Goodbye"]
+    with open(input_path, "w", encoding="utf-8") as f:
+        for i in range(10):
+            f.write(json.dumps({"id": i, "message": messages[i % 4]}) + "\n")
+    
+    args = [str(input_path), str(output_path), "--chunk-size", "3"]
+    assert run(parse_args(args)) == 10
+    full_output = output_path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in full_output] == list(range(10))
+    
+    # Simulate a run interrupted after the first two chunks
+    output_path.write_text("\n".join(full_output[:6]) + "\n", encoding="utf-8")
+    with open(str(output_path) + ".progress", "w") as f:
+        json.dump({"records_done": 6}, f)
+    
+    assert run(parse_args(args + ["--resume"])) == 10
+    assert output_path.read_text(encoding="utf-8").splitlines() == full_output
+    
+    # Interrupted after the third chunk was written but before its progress was saved
+    committed = "\n".join(full_output[:6]) + "\n"
+    output_path.write_text("\n".join(full_output[:9]) + "\n", encoding="utf-8")
+    with open(str(output_path) + ".progress", "w") as f:
+        json.dump({"records_done": 6, "output_bytes": len(committed.encode("utf-8"))}, f)
+    
+    assert run(parse_args(args + ["--resume"])) == 10
+    assert output_path.read_text(encoding="utf-8").splitlines() == full_output
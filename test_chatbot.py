@@ -78,12 +78,276 @@ def test_chatbot():
     print(f"Response: {result2['response']}")
     
     # Check session memory
-    if user_id in chatbot.session_memory:
-        print(f"Session memory entries: {len(chatbot.session_memory[user_id])}")
+    print(f"Session memory entries: {len(chatbot.get_session(user_id))}")
     
     print()
     print("🎉 All tests passed successfully!")
     print("The SkillHigh Chatbot is ready for use!")
 
+def test_compact_model(monkeypatch):
+    """Test that the compact model matches the full sklearn model and is only used when smaller"""
+    import numpy as np
+    from app import chatbot as chatbot_module
+    from app.chatbot import SkillHighChatbot
+    from app.compact_model import model_nbytes
+    
+    full = SkillHighChatbot()
+    full.use_compact_model = False
+    full.train_model("data/intents.csv")
+    
+    compact = SkillHighChatbot()
+    compact.train_model("data/intents.csv")
+    
+    assert compact.compact_model is not None
+    assert compact.memory_report['predictions_identical']
+    assert compact.memory_report['saved_bytes_per_worker'] > 0
+    
+    for text in ["Hi there!", "What are the course fees?", "Can I get a refund?", "Goodbye"]:
+        assert compact.predict_intent(text)[0] == full.predict_intent(text)[0]
+    
+    # Sizes are in-memory: array buffers are counted, shared objects only once
+    weights = np.zeros(1000, dtype=np.float32)
+    assert model_nbytes(weights) >= weights.nbytes
+    assert model_nbytes(weights, [weights]) < 2 * weights.nbytes
+    
+    # A compact model that is not smaller is not swapped in
+    monkeypatch.setattr(chatbot_module, 'model_nbytes', lambda *objects: 100)
+    unchanged = SkillHighChatbot()
+    assert unchanged.train_model("data/intents.csv")
+    assert unchanged.compact_model is None
+    assert unchanged.predict_intent("Goodbye")[0] == full.predict_intent("Goodbye")[0]
+    
+    print(f"Memory saved per worker: {compact.memory_report['saved_bytes_per_worker']} bytes")
+
+def test_context_priors():
+    """Test that transition priors resolve ambiguous follow-ups and leave clear messages alone"""
+    import numpy as np
+    from app.context import IntentTransitionPriors
+    
+    priors = IntentTransitionPriors(['AskCourses', 'AskDuration', 'AskRefund', 'Greeting'])
+    proba = np.array([0.20, 0.25, 0.24, 0.31])
+    
+    # A follow-up of the previous topic beats both an unrelated topic and a mid-conversation greeting
+    assert priors.apply(proba, ['AskCourses']).argmax() == 1
+    assert priors.apply(proba, ['AskRefund']).argmax() == 2
+    
+    # A clear message is never re-weighted, and social turns add no prior
+    clear = np.array([0.05, 0.05, 0.05, 0.85])
+    assert priors.apply(clear, ['AskCourses', 'AskCourses', 'AskCourses']) is clear
+    assert priors.apply(proba, ['Greeting']) is proba
+    assert priors.apply(proba, []) is proba
+    
+    # Only the most recent turns are used
+    assert priors.apply(proba, ['AskCourses', 'Greeting', 'Greeting', 'Greeting']) is proba
+    
+    # Calibration shrinks the priors until a correct training prediction cannot be overturned
+    calibrated = IntentTransitionPriors.calibrate(priors.classes, [proba], ['Greeting'])
+    assert 0 < calibrated.scale < 1
+    assert calibrated.apply(proba, ['AskCourses']).argmax() == 3
+
+def test_context_priors_on_trained_model():
+    """Test that session context resolves follow-ups without breaking correct predictions"""
+    import pandas as pd
+    from app.chatbot import SkillHighChatbot
+    
+    bot = SkillHighChatbot()
+    assert bot.train_model("data/intents.csv")
+    df = pd.read_csv("data/intents.csv").dropna()
+    
+    def in_context(previous, text):
+        bot.clear_session("ctx_user")
+        bot.state_store.append_turn("ctx_user", {'intent': previous})
+        return bot.predict_intent(text, "ctx_user")[0]
+    
+    # Whatever came before, a correctly classified utterance stays correct
+    for previous in sorted(bot.transition_priors.topical):
+        for text, label in zip(df['Text'], df['Intent']):
+            if bot.predict_intent(text)[0] == label:
+                assert in_context(previous, text) == label, (previous, text)
+    
+    # Follow-ups after a course question lean towards what usually comes next
+    assert in_context("AskCourses", "and how long is it?") == "AskDuration"
+    assert in_context("AskCourses", "is it online?") == "AskMode"
+    assert in_context("AskCourses", "tell me more") == "AskCourses"
+    assert in_context("AskFees", "Can I get a refund?") == "AskRefund"
+    assert in_context("AskCourses", "Thank you") == "Gratitude"
+    assert in_context("AskCourses", "Hi") == "Greeting"
+    
+    # The prediction feeds back into the session, so the conversation can move on
+    bot.clear_session("ctx_user")
+    bot.state_store.append_turn("ctx_user", {'intent': "AskCourses"})
+    for text, intent in [("and how long is it?", "AskDuration"), ("do I get a certificate?", "AskCertification"),
+                         ("Bye", "Goodbye")]:
+        assert bot.get_response(text, "ctx_user")['intent'] == intent, text
+
+def test_response_bundle(tmp_path):
+    """Test pre-rendered responses, hand-written bundles and one-time translation"""
+    from app.responses import build_response_bundle
+    
+    (tmp_path / "response_bundle.csv").write_text(
+        "Language,Intent,Response\n"
+        "hi,AskFees,फीस ₹8000 से शुरू होती है।\n"
+        "hi,EmpathyPrefix,मैं आपकी चिंता समझता हूँ।\n",
+        encoding="utf-8"
+    )
+    
+    calls = []
+    def translate(text, language):
+        calls.append(text)
+        return f"[{language}] {text}"
+    
+    responses = {"AskFees": "Fees start at 8000.", "Goodbye": "Bye!"}
+    bundle = build_response_bundle(responses, str(tmp_path / "intents.csv"), translate=translate)
+    
+    assert bundle.render("AskFees", 0, "en") == "Fees start at 8000."
+    assert bundle.render("AskFees", 1, "en") == "I understand your concern. Fees start at 8000."
+    assert bundle.render("Missing", 0, "en").startswith("I'm sorry")
+    
+    # Hand-written variants are served without translation
+    assert bundle.render("AskFees", 1, "hi") == "मैं आपकी चिंता समझता हूँ। फीस ₹8000 से शुरू होती है।"
+    assert calls == []
+    
+    # Missing variants are translated once, then served from the table
+    assert bundle.render("Goodbye", 0, "hi") == "[hi] Bye!"
+    assert bundle.render("Goodbye", 0, "hi") == "[hi] Bye!"
+    assert calls == ["Bye!"]
+
+def test_embedding_classifier(tmp_path):
+    """Test the quantized embedding index with a stand-in encoder"""
+    import os
+    import numpy as np
+    from app.embeddings import EmbeddingIntentClassifier
+    
+    vocabulary = ["fee", "cost", "price", "refund", "money", "back", "hello"]
+    calls = []
+    def encoder(texts, batch_size):
+        calls.append(list(texts))
+        return np.array([[float(word in text) for word in vocabulary] for text in texts])
+    
+    texts = ["fee cost", "price fee", "refund money back", "money back", "hello"]
+    labels = ["AskFees", "AskFees", "AskRefund", "AskRefund", "Greeting"]
+    index_path = str(tmp_path / "index.npz")
+    
+    classifier = EmbeddingIntentClassifier(encoder=encoder, model_path="stub", index_path=index_path)
+    classifier.fit(texts, labels)
+    assert classifier.codes.dtype == np.int8
+    
+    proba = classifier.predict_proba_batch(["what is the price", "can i get a refund"])
+    assert [classifier.classes[i] for i in proba.argmax(axis=1)] == ["AskFees", "AskRefund"]
+    
+    # Cached queries are not re-encoded, and an unchanged corpus reuses the persisted index
+    calls.clear()
+    classifier.predict_proba("what is the price")
+    EmbeddingIntentClassifier(encoder=encoder, model_path="stub", index_path=index_path).fit(texts, labels)
+    assert calls == []
+    
+    # A truncated index (e.g. read while another worker writes) is rebuilt, not an error
+    with open(index_path, 'r+b') as f:
+        f.truncate(20)
+    EmbeddingIntentClassifier(encoder=encoder, model_path="stub", index_path=index_path).fit(texts, labels)
+    assert len(calls) == 1
+    assert EmbeddingIntentClassifier(encoder=encoder, model_path="stub", index_path=index_path).load_index(
+        classifier.fingerprint(texts, labels)) is not None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+def test_corpus_ingestion():
+    """Test duplicate collapsing, weights and the response table"""
+    import pandas as pd
+    from app.chatbot import SkillHighChatbot
+    from app.ingestion import ingest_corpus
+    
+    df = pd.DataFrame({
+        'Text': ["Hi", "Hi!", "Hiii", "What is the refund policy?", "What is the refund policy", "Bye"],
+        'Intent': ["Greeting", "Greeting", "Greeting", "AskRefund", "AskFees", "Goodbye"],
+        'Response': ["Hello!", "Hello!", "Hello!", "Refunds within 7 days.", "Fees vary.", "Goodbye!"]
+    })
+    corpus = ingest_corpus(df, SkillHighChatbot().preprocess_text)
+    
+    weights = dict(zip(zip(corpus.texts, corpus.labels), corpus.weights))
+    assert weights[("hi", "Greeting")] == 3
+    assert corpus.stats['exact_duplicates'] == 1
+    assert corpus.stats['near_duplicates'] == 1
+    
+    # Identical text with different intents is kept and reported, never merged
+    assert ("what is the refund policy", "AskFees") in weights
+    assert ("what is the refund policy", "AskRefund") in weights
+    assert corpus.responses == {"Greeting": "Hello!", "AskRefund": "Refunds within 7 days.",
+                                "AskFees": "Fees vary.", "Goodbye": "Goodbye!"}
+
+def test_language_fast_path():
+    """Test local language detection and that English/Hinglish input skips translation"""
+    from app.chatbot import SkillHighChatbot
+    from app.language import LanguageIdentifier, normalize_hinglish
+    
+    identifier = LanguageIdentifier()
+    assert identifier.detect("What courses do you offer?") == "en"
+    assert identifier.detect("course ki fees kitni hai") == "hinglish"
+    assert identifier.detect("कोर्स की फीस क्या है") == "hi"
+    assert identifier.detect("கட்டணம் எவ்வளவு?") == "other"
+    assert identifier.detect("ফি কত?") == "other"
+    assert identifier.detect("فیس کتنی ہے؟") == "other"
+    assert identifier.detect("Qué cursos ofrecen?") == "en"
+    assert normalize_hinglish("Fees kitni hai?") == "fees how much is"
+    
+    bot = SkillHighChatbot()
+    assert bot.train_model("data/intents.csv")
+    translated = []
+    bot.translate_text = lambda text, target_lang='hi': translated.append((text, target_lang)) or text
+    
+    trace = {}
+    bot.get_response("mujhe internship ke baare mein batao", "lang_user", "hi", trace=trace)
+    bot.get_response("What courses do you offer?", "lang_user", "hi", trace=trace)
+    assert all(target != 'en' for _, target in translated)
+    assert 'translate_input' not in trace['stages']
+    assert 'normalize_input' in trace['stages']
+    
+    bot.get_response("कोर्स की फीस क्या है", "lang_user", "hi")
+    assert ("कोर्स की फीस क्या है", 'en') in translated
+    
+    # Scripts other than Latin and Devanagari are translated too
+    trace = {}
+    bot.get_response("கட்டணம் எவ்வளவு?", "lang_user", "ta", trace=trace)
+    assert ("கட்டணம் எவ்வளவு?", 'en') in translated
+    assert 'translate_input' in trace['stages']
+
+def test_shared_state_store(tmp_path):
+    """Test that workers sharing a SQLite state file see one session and analytics view"""
+    from app.state import SQLiteStateStore
+    
+    path = str(tmp_path / "state.db")
+    worker_a, worker_b = SQLiteStateStore(path, max_turns=2), SQLiteStateStore(path, max_turns=2)
+    
+    for i in range(3):
+        (worker_a if i % 2 else worker_b).append_turn("user1", {'intent': f"Intent{i}"})
+    assert worker_a.get_session("user1") == [{'intent': "Intent1"}, {'intent': "Intent2"}]
+    version = worker_a.session_version("user1")
+    assert version == worker_b.session_version("user1") > 0
+    
+    # A delete on one worker is visible to the other and invalidates its snapshot version
+    assert worker_b.clear_session("user1")
+    assert worker_a.get_session("user1") == []
+    assert worker_a.session_version("user1") > version
+    assert not worker_a.clear_session("user1")
+    
+    worker_a.record_conversation("AskFees", "neutral", "en", "2024-01-01")
+    worker_b.record_conversation("AskFees", "positive", "hi", "2024-01-01")
+    analytics = worker_a.analytics()
+    assert analytics['total_conversations'] == 2
+    assert analytics['intent_counts'] == {"AskFees": 2}
+    assert analytics['language_usage'] == {'en': 1, 'hi': 1}
+    assert worker_a.analytics_version() == worker_b.analytics_version()
+    
+    # Turns are stored as JSON, and a state file in a shared writable directory is refused
+    worker_a.append_turn("user2", {'intent': "Greeting", 'timestamp': "2024-01-01T10:00:00"})
+    assert worker_b.get_session("user2") == [{'intent': "Greeting", 'timestamp': "2024-01-01T10:00:00"}]
+    shared_dir = tmp_path / "shared"
+    shared_dir.mkdir()
+    shared_dir.chmod(0o777)
+    try:
+        SQLiteStateStore(str(shared_dir / "state.db"))
+        assert False, "expected PermissionError"
+    except PermissionError:
+        pass
+
 if __name__ == "__main__":
     test_chatbot()
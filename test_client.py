@@ -0,0 +1,165 @@
+# Test script for the SkillHigh Chatbot API client SDK
+# Runs against a local stub server so retries, ordering and timeouts are observable
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app import client as client_module
+from app.client import ChatClient, AsyncChatClient
+
+
+class StubServer:
+    """Local HTTP server replaying scripted responses and logging every request"""
+
+    def __init__(self):
+        self.requests = []
+        self.scripts = {}
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def handle_request(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                with stub.lock:
+                    stub.requests.append((self.command, self.path, body))
+                    script = stub.scripts.get((self.command, self.path))
+                    status, headers, delay = script.pop(0) if script else (200, {}, 0)
+
+                # Random jitter exposes requests that are sent concurrently
+                time.sleep(delay or random.uniform(0, 0.01))
+                payload = json.dumps({"response": body.get("message") if body else "ok"}).encode()
+                try:
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            do_GET = do_POST = do_DELETE = handle_request
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def script(self, method, path, *responses):
+        """Queue (status, headers, delay) responses for a route"""
+        self.scripts[(method, path)] = list(responses)
+
+    def count(self, method, path):
+        return sum(1 for m, p, _ in self.requests if (m, p) == (method, path))
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    monkeypatch.setattr(client_module, 'backoff_delay', lambda attempt: 0)
+    server = StubServer()
+    yield server
+    server.close()
+
+
+def test_post_retries_only_unhandled_failures(stub):
+    """Test that POST /chat is never re-sent after the server may have handled it"""
+    client = ChatClient(stub.url, timeout=0.2, max_retries=3)
+
+    # Slower than the timeout: one POST and a ReadTimeout, no duplicate turns
+    stub.script('POST', '/chat', (200, {}, 0.5))
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.chat("hi")
+    assert stub.count('POST', '/chat') == 1
+
+    # 504 may come after the upstream handled the request
+    stub.requests.clear()
+    stub.script('POST', '/chat', (504, {}, 0))
+    client.chat("hi")
+    assert stub.count('POST', '/chat') == 1
+
+    # 503 and 429 were rejected before processing and are sent again
+    stub.requests.clear()
+    stub.script('POST', '/chat', (503, {}, 0), (429, {'Retry-After': '0'}, 0))
+    assert client.chat("hi") == {"response": "hi"}
+    assert stub.count('POST', '/chat') == 3
+    client.close()
+
+def test_get_retries_timeouts_and_gateway_errors(stub):
+    """Test that idempotent GETs are retried on 504 and read timeouts"""
+    client = ChatClient(stub.url, timeout=0.2, max_retries=3)
+
+    stub.script('GET', '/session/u', (504, {}, 0), (200, {}, 0.5), (200, {}, 0))
+    assert client.get_session("u") == {"response": "ok"}
+    assert stub.count('GET', '/session/u') == 3
+    client.close()
+
+def test_connect_errors_are_retried(monkeypatch):
+    """Test that a POST that never reached a server is retried and then raised"""
+    monkeypatch.setattr(client_module, 'backoff_delay', lambda attempt: 0)
+    client = ChatClient("http://127.0.0.1:9", timeout=0.2, max_retries=2)
+    attempts = []
+    send = client.session.request
+    monkeypatch.setattr(client.session, 'request', lambda *args, **kwargs: attempts.append(1) or send(*args, **kwargs))
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.chat("hi")
+    assert len(attempts) == 3
+
+    # A connection dropped after sending is not a connect error
+    assert not client_module.is_connect_error(requests.exceptions.ConnectionError("Connection aborted"))
+    client.close()
+
+def test_chat_batch_orders_each_user(stub):
+    """Test that one user's messages arrive in order while replies keep input order"""
+    client = ChatClient(stub.url, pool_size=4)
+    messages = [{"message": f"{user}-{i}", "user_id": user} for i in range(5) for user in ("a", "b", "c")]
+
+    replies = client.chat_batch(messages)
+    assert [reply["response"] for reply in replies] == [m["message"] for m in messages]
+    for user in ("a", "b", "c"):
+        received = [body["message"] for _, _, body in stub.requests if body["user_id"] == user]
+        assert received == [f"{user}-{i}" for i in range(5)]
+    assert client.chat_batch([]) == []
+    client.close()
+
+def test_async_client(stub):
+    """Test the async client's retry rules and per-user batch ordering"""
+    async def scenario():
+        async with AsyncChatClient(stub.url, timeout=0.2, max_retries=3) as client:
+            stub.script('POST', '/chat', (503, {}, 0))
+            assert (await client.chat("hi")) == {"response": "hi"}
+            assert stub.count('POST', '/chat') == 2
+
+            stub.requests.clear()
+            stub.script('POST', '/chat', (200, {}, 0.5))
+            with pytest.raises(client_module.HTTPX_TRANSPORT_ERRORS):
+                await client.chat("slow")
+            assert stub.count('POST', '/chat') == 1
+
+            # Let the timed-out request finish before checking batch order
+            await asyncio.sleep(0.4)
+            stub.requests.clear()
+            replies = await client.chat_batch(["one", "two", "three"], user_id="u")
+            assert [reply["response"] for reply in replies] == ["one", "two", "three"]
+            assert [body["message"] for _, _, body in stub.requests] == ["one", "two", "three"]
+
+    asyncio.run(scenario())